@@ -5,21 +5,105 @@
 
 6時間ごとに収集されたデータを、1日1レコードに集約します。
 各日の最終記録（その日の最も遅い時刻のデータ）を採用します。
+
+全タレントの動画を CHUNK_SIZE 本ずつのタスクに分け、プロセスプールで並列に集約します
+（--workers 1 で従来どおり1プロセスで処理）。出力内容は並列数によらず同じです。
+親プロセスはJSONを1動画ずつ読み込んでワーカーに渡すだけで、レコードの解析・実行ごとの系列への
+復元・日次集約・出力のエンコードはワーカーで行います。
+
+入力は1動画ずつ読み込み、出力も1動画ずつ書き出すので、メモリ使用量は
+処理中のタスク分（最大 MAX_PENDING_CHUNKS × CHUNK_SIZE 本）に収まります。
+
+集約した日次系列から、コホート別の成長曲線（cohort_curves_*.json）を
+新しく確定した日の分だけ更新し、キリ番の達成予測（milestone_forecast_*.json）を
+作り直します。
 """
 
-import json
+import argparse
 import os
-from datetime import datetime
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from storage import JsonObjectWriter, encode_json
+from daily_history import decode_video_item, iter_raw_daily_history
+from video_series import video_to_dict
+from cohort_curves import CohortCurves, cohort_file_path
+from milestone_forecast import ForecastCollector, forecast_file_path
+
+CHUNK_SIZE = 50  # 1タスクで集約する動画数
+MAX_PENDING_CHUNKS = 8  # 1タレントあたり同時に投入しておくタスク数
+
+def warn_invalid_timestamp(timestamp):
+    print(f"⚠️  無効なタイムスタンプをスキップ: {timestamp}")
+
+def aggregate_video_chunk(layout, items):
+    """動画のまとまりを集約（プロセスプールのタスク）
+    
+    保存形式のレコードを解析して実行ごとの系列に戻し、各日の最終記録
+    （その日の最も遅い時刻のレコード）を採用する。
+    
+    Args:
+        layout: iter_raw_daily_history が返す layout
+        items: [(動画ID, 保存形式の動画情報), ...]
+    
+    Returns:
+        (動画数, 集約前のレコード数, [(VideoMeta, 日次の MetricSeries, エンコード済みの出力), ...])
+        （レコードのない動画は結果に含めない）
+    """
+    records_before = 0
+    results = []
+    for video_id, video_info in items:
+        meta, series = decode_video_item(layout, video_id, video_info, warn_invalid_timestamp)
+        records_before += len(series)
+        if not len(series):
+            continue
+        
+        daily = series.daily_last()
+        results.append((meta, daily, encode_json(video_to_dict(meta, daily))))
+    return len(items), records_before, results
 
-def aggregate_daily_data(input_file, output_file):
+def iter_video_chunks(items):
+    """動画を CHUNK_SIZE 本ずつにまとめる"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def map_chunks(layout, chunks, executor):
+    """チャンクを順に集約する（executorがあれば並列、結果は投入順）
+    
+    Yields:
+        aggregate_video_chunk の戻り値
+    """
+    if executor is None:
+        for chunk in chunks:
+            yield aggregate_video_chunk(layout, chunk)
+        return
+    
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(aggregate_video_chunk, layout, chunk))
+        if len(pending) >= MAX_PENDING_CHUNKS:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def aggregate_daily_data(input_file, output_file, executor=None, cohort_file=None, forecast_file=None):
     """
     生データを日次集約する
     
     Args:
         input_file: 入力ファイル（video_daily_history_*.json）
         output_file: 出力ファイル（video_daily_aggregated_*.json）
+        executor: 集約タスクを投入するプロセスプール（Noneなら現在のプロセスで処理）
+        cohort_file: 更新するコホート別成長曲線のファイル（Noneなら更新しない）
+        forecast_file: キリ番の達成予測を保存するファイル（Noneなら予測しない）
     """
+    label = os.path.basename(input_file)
     print(f"📊 処理開始: {input_file}")
     
     # データ読み込み
@@ -27,73 +111,72 @@ def aggregate_daily_data(input_file, output_file):
         print(f"⚠️  ファイルが見つかりません: {input_file}")
         return
     
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    aggregated_data = {}
-    total_videos = len(data)
+    total_videos = 0
     processed_videos = 0
+    total_records_before = 0
+    total_records_after = 0
+    cohort_curves = CohortCurves.load(cohort_file) if cohort_file else None
+    cohort_samples = 0
+    forecast = ForecastCollector() if forecast_file else None
     
-    # 動画ごとに処理
-    for video_id, video_info in data.items():
-        records = video_info.get('records', [])
-        
-        if not records:
-            continue
-        
-        # 日付ごとにグループ化
-        daily_records = defaultdict(list)
-        
-        for record in records:
-            timestamp_str = record.get('timestamp', '')
-            try:
-                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                date_key = timestamp.strftime('%Y-%m-%d')  # 日付のみ
-                daily_records[date_key].append({
-                    'timestamp': timestamp,
-                    'record': record
-                })
-            except ValueError:
-                print(f"⚠️  無効なタイムスタンプをスキップ: {timestamp_str}")
-                continue
-        
-        # 各日付の最終レコードを選択
-        aggregated_records = []
-        for date_key in sorted(daily_records.keys()):
-            # その日の最も遅い時刻のレコードを取得
-            latest = max(daily_records[date_key], key=lambda x: x['timestamp'])
-            aggregated_records.append(latest['record'])
-        
-        # 集約データに追加
-        aggregated_data[video_id] = {
-            'タイトル': video_info.get('タイトル', ''),
-            '公開日': video_info.get('公開日', ''),
-            'type': video_info.get('type', 'Movie'),
-            'records': aggregated_records
-        }
-        
-        processed_videos += 1
-        
-        # 進捗表示
-        if processed_videos % 10 == 0 or processed_videos == total_videos:
-            print(f"  処理中... {processed_videos}/{total_videos} 動画")
-    
-    # 保存
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(aggregated_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"✅ 完了: {output_file}")
-    print(f"   - 処理した動画数: {processed_videos}")
-    
-    # 統計情報
-    total_records_before = sum(len(v.get('records', [])) for v in data.values())
-    total_records_after = sum(len(v.get('records', [])) for v in aggregated_data.values())
-    print(f"   - レコード数: {total_records_before} → {total_records_after}")
-    print(f"   - 削減率: {(1 - total_records_after/total_records_before)*100:.1f}%")
-    print()
+    layout, items = iter_raw_daily_history(input_file)
+    with JsonObjectWriter(output_file) as writer:
+        for video_count, records_before, results in map_chunks(layout, iter_video_chunks(items), executor):
+            for meta, daily, encoded in results:
+                writer.write_encoded(meta.video_id, encoded)
+                total_records_after += len(daily)
+                if cohort_curves is not None:
+                    cohort_samples += cohort_curves.observe(meta, daily)
+                if forecast is not None:
+                    forecast.add(meta, daily)
+            total_videos += video_count
+            processed_videos += len(results)
+            total_records_before += records_before
+            print(f"  処理中... {label}: {total_videos} 動画")
+    
+    # 統計情報（並列実行時に他のタレントの出力と混ざらないよう1回で出力）
+    summary = [
+        f"✅ 完了: {output_file}",
+        f"   - 処理した動画数: {processed_videos}",
+        f"   - レコード数: {total_records_before} → {total_records_after}"
+    ]
+    if total_records_before > 0:
+        summary.append(f"   - 削減率: {(1 - total_records_after/total_records_before)*100:.1f}%")
+    if cohort_curves is not None:
+        cohort_curves.save(cohort_file)
+        summary.append(f"   - コホート成長曲線: {cohort_samples} 日分を追加 ({cohort_file})")
+    if forecast is not None:
+        forecast_count = forecast.save(forecast_file)
+        summary.append(f"   - キリ番予測: {forecast_count}件 ({forecast_file})")
+    print('\n'.join(summary) + '\n')
+
+def aggregate_talents_parallel(talents, workers):
+    """全タレントを並列に日次集約する
+    
+    タレントごとの読み書きはスレッドで同時に進め、動画CHUNK_SIZE本ごとの集約タスクは
+    共有のプロセスプールで処理する。各タレントの出力は元の動画順に書き出す。
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        with ThreadPoolExecutor(max_workers=len(talents)) as threads:
+            futures = [
+                threads.submit(aggregate_daily_data,
+                               f'video_daily_history_{talent}.json',
+                               f'video_daily_aggregated_{talent}.json',
+                               executor,
+                               cohort_file_path(talent),
+                               forecast_file_path(talent))
+                for talent in talents
+            ]
+            for future in futures:
+                future.result()
 
 def main():
     """メイン処理"""
+    parser = argparse.ArgumentParser(description='動画履歴データを日次集約する')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='並列プロセス数（1で並列化しない）')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("📅 動画履歴データ日次集約スクリプト")
     print("=" * 60)
@@ -101,7 +184,7 @@ def main():
     
     # タレントリストを取得
     talents = []
-    for file in os.listdir('.'):
+    for file in sorted(os.listdir('.')):
         if file.startswith('video_daily_history_') and file.endswith('.json'):
             talent_name = file.replace('video_daily_history_', '').replace('.json', '')
             talents.append(talent_name)
@@ -112,13 +195,19 @@ def main():
         return
     
     print(f"🎯 処理対象タレント: {', '.join(talents)}")
+    print(f"⚙️  並列プロセス数: {args.workers}")
     print()
     
     # 各タレントのデータを集約
-    for talent in talents:
-        input_file = f'video_daily_history_{talent}.json'
-        output_file = f'video_daily_aggregated_{talent}.json'
-        aggregate_daily_data(input_file, output_file)
+    if args.workers <= 1:
+        for talent in talents:
+            input_file = f'video_daily_history_{talent}.json'
+            output_file = f'video_daily_aggregated_{talent}.json'
+            aggregate_daily_data(input_file, output_file,
+                                 cohort_file=cohort_file_path(talent),
+                                 forecast_file=forecast_file_path(talent))
+    else:
+        aggregate_talents_parallel(talents, args.workers)
     
     print("=" * 60)
     print("🎉 すべての処理が完了しました！")
@@ -2,23 +2,38 @@
 # -*- coding: utf-8 -*-
 """
 YouTube チャンネル統計 自動チェックスクリプト（複数チャンネル対応・並列処理版）
-GitHub Actionsで定期実行される
+GitHub Actionsで定期実行される（--watch で常駐させ、チャンネルごとの間隔で繰り返しチェックすることもできる）
 Movie/Short/LiveArchive判別機能付き（Short判定は並列処理で高速化）
 タイプ自動修正機能付き
 """
 
+import argparse
 import os
 import json
 import requests
-from datetime import datetime
+import sched
+import signal
+from datetime import datetime, timedelta
 from googleapiclient.discovery import build
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import io
+import sys
+import threading
 import time
 import isodate
 
+from storage import load_json, read_json, save_json
+from daily_history import add_run, append_observation, iter_videos, load_daily_history, save_daily_history
+from video_series import MetricSeries
+from milestones import generate_like_milestones, generate_view_milestones
+from channel_stats_store import append_channel_stats, backfill_channel_stats, has_channel_stats, make_entry
+from milestone_events import append_milestone_events, has_milestone_events, rebuild_milestone_events
+from notification_outbox import MAX_ATTEMPTS, NotificationOutbox
+from view_spikes import SPIKE_TYPE, ViewSpikeDetector, append_spike_events, state_file_path as spike_state_file_path
+
 # 環境変数から設定を読み込み
 API_KEY = os.environ.get('YOUTUBE_API_KEY')
 CHANNELS_JSON = os.environ.get('CHANNELS', '[]')
@@ -26,6 +41,7 @@ EMAIL_ENABLED = os.environ.get('EMAIL_ENABLED', 'false').lower() == 'true'
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', '')
 SENDER_PASSWORD = os.environ.get('SENDER_PASSWORD', '')
 RECEIVER_EMAIL = os.environ.get('RECEIVER_EMAIL', '')
+FULL_SCAN = os.environ.get('FULL_SCAN', 'false').lower() == 'true'  # アップロードプレイリストを毎回全件走査する
 
 # チャンネル設定をパース
 try:
@@ -35,34 +51,21 @@ except:
 
 # 並列処理の設定
 MAX_WORKERS = 10  # Short判定の同時実行数
+CHANNEL_WORKERS = 3  # 同時に処理するチャンネル数
+COALESCE_WINDOW = 0.5  # 50件に満たない videos.list を他チャンネル分と合流させる待ち時間（秒）
 
-def generate_view_milestones(max_value=100000000):
-    """再生数のキリ番を生成"""
-    milestones = [500]  # 最初のキリ番
-    
-    # 1,000～9,000（1,000刻み）
-    for i in range(1000, 10000, 1000):
-        milestones.append(i)
-    
-    # 10,000以降（5,000刻み）
-    current = 10000
-    while current <= max_value:
-        milestones.append(current)
-        current += 5000
-    
-    return milestones
+# 動画メタデータキャッシュの設定
+METADATA_REFRESH_HOURS = 24  # タイトル等のsnippetを再取得する間隔（時間）
+KNOWN_RETENTION_DAYS = 30  # 取得できなくなった動画（一時的な欠落・非公開）を既知として追い続ける日数
+FULL_VIDEO_PARTS = 'snippet,statistics,liveStreamingDetails,contentDetails'
+STATS_VIDEO_FIELDS = 'items(id,statistics(viewCount,likeCount,commentCount))'
+VIDEOS_LIST_BATCH = 50  # videos.list に一度に渡せる動画IDの上限
 
-def generate_like_milestones(max_value=1000000):
-    """高評価数のキリ番を生成"""
-    milestones = []
-    
-    # 100刻み
-    current = 100
-    while current <= max_value:
-        milestones.append(current)
-        current += 100
-    
-    return milestones
+# 通知の設定
+SMTP_TIMEOUT = 30  # SMTPの接続・送信のタイムアウト（秒）
+DELIVERY_TIMEOUT = 120  # 実行の最後に通知の送信を待つ上限（秒）
+WATCH_INTERVAL_MINUTES = 60  # --watch の既定のチェック間隔（分、チャンネル設定の interval が優先）
+WATCH_PERSIST_MINUTES = 60  # --watch で動画別履歴などの大きいファイルを書き出す間隔（分）
 
 def get_duration_minutes(video):
     """動画の長さを分単位で取得"""
@@ -78,25 +81,36 @@ def load_video_type_overrides():
     override_file = 'video_type_overrides.json'
     if os.path.exists(override_file):
         try:
-            with open(override_file, 'r', encoding='utf-8') as f:
-                overrides = json.load(f)
-                print(f"✓ 例外設定を読み込みました: {sum(len(v) for v in overrides.values())}件")
-                return overrides
+            overrides = read_json(override_file)
+            print(f"✓ 例外設定を読み込みました: {sum(len(v) for v in overrides.values())}件")
+            return overrides
         except Exception as e:
             print(f"⚠️ 例外設定の読み込みエラー: {str(e)}")
             return {}
     return {}
 
+def create_http_session():
+    """Short判定用のHTTPセッション（同時実行数分の接続を保持して使い回す）
+    
+    CHANNEL_WORKERS チャンネルがそれぞれ MAX_WORKERS 並列で判定するので、その分の接続を保持する
+    （足りないと urllib3 が余分な接続を開いては捨てることになる）。
+    """
+    session = requests.Session()
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=CHANNEL_WORKERS * MAX_WORKERS))
+    return session
+
+HTTP_SESSION = create_http_session()
+
 def is_short_video(video_id):
-    """動画IDがShortsかどうかをURLで判別"""
+    """動画IDがShortsかどうかをURLで判別（判定できなかった場合はNone）"""
     try:
         shorts_url = f"https://www.youtube.com/shorts/{video_id}"
-        response = requests.head(shorts_url, allow_redirects=True, timeout=5)
+        response = HTTP_SESSION.head(shorts_url, allow_redirects=True, timeout=5)
         # Shortsページが存在すればShort
         return 'shorts' in response.url.lower()
     except Exception as e:
-        # エラーの場合はShortではないと判断
-        return False
+        # エラーの場合はShortではないと判断（メタデータキャッシュには残さず次回判定し直す）
+        return None
 
 def check_shorts_batch(video_ids):
     """複数の動画IDを並列でShortチェック"""
@@ -126,7 +140,7 @@ def check_shorts_batch(video_ids):
                     print(f"    → {completed}/{len(video_ids)}本完了")
             except Exception as e:
                 print(f"  ⚠️ Short判定エラー [{video_id}]: {str(e)}")
-                results[video_id] = False
+                results[video_id] = None
     
     elapsed = time.time() - start_time
     short_count = sum(1 for v in results.values() if v)
@@ -190,16 +204,18 @@ def determine_video_type(video, short_cache=None, overrides=None, channel_name=N
     # 4. それ以外はMovie（通常動画、プレミア公開含む）
     return 'Movie'
 
-def send_email_notification(achievements, channel_name):
-    """キリ番達成をメールで通知"""
-    if not EMAIL_ENABLED or not achievements:
-        return False
-    
-    try:
-        # メール本文を作成
+def build_notification_message(notifications, channel_name):
+    """キリ番達成・急上昇の通知メールを作成（1チャンネル分のまとめ）"""
+    achievements = [n for n in notifications if n['タイプ'] != SPIKE_TYPE]
+    spikes = [n for n in notifications if n['タイプ'] == SPIKE_TYPE]
+    if spikes:
+        subject = f"🎉 [{channel_name}] YouTube通知 - キリ番達成 {len(achievements)}件 / 急上昇 {len(spikes)}件"
+    else:
         subject = f"🎉 [{channel_name}] YouTubeキリ番達成通知 - {len(achievements)}件"
-        
-        body = f"[{channel_name}] YouTubeチャンネルでキリ番を達成しました！\n\n"
+    
+    body = ""
+    if achievements:
+        body += f"[{channel_name}] YouTubeチャンネルでキリ番を達成しました！\n\n"
         body += "=" * 50 + "\n\n"
         
         for i, achievement in enumerate(achievements, 1):
@@ -210,29 +226,87 @@ def send_email_notification(achievements, channel_name):
             body += f"【{i}】{achievement['タイトル']}\n"
             body += f"   {emoji} {metric_type}: {achievement['キリ番']:,}{unit}を突破！\n"
             body += f"   現在の{metric_type}: {achievement['現在の値']:,}{unit}\n"
-            body += f"   タイプ: {achievement.get('type', 'N/A')}\n"
+            body += f"   タイプ: {achievement.get('type') or 'N/A'}\n"
             body += f"   動画URL: https://www.youtube.com/watch?v={achievement['動画ID']}\n\n"
         
         body += "=" * 50 + "\n"
-        body += f"通知日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}\n"
+    
+    if spikes:
+        body += f"\n[{channel_name}] 再生数が急上昇している動画があります！\n\n"
+        body += "=" * 50 + "\n\n"
         
-        # MIMEメッセージを作成
-        msg = MIMEMultipart()
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = RECEIVER_EMAIL
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain', 'utf-8'))
+        for i, spike in enumerate(spikes, 1):
+            ratio = spike['日速'] / spike['平常時の日速'] if spike['平常時の日速'] > 0 else None
+            body += f"【{i}】{spike['タイトル']}\n"
+            body += f"   🚀 伸び: +{spike['日速']:,}回/日（平常時 +{spike['平常時の日速']:,}回/日"
+            body += f"、{ratio:.1f}倍）\n" if ratio else "）\n"
+            body += f"   現在の再生数: {spike['現在の値']:,}回\n"
+            body += f"   検出日時: {spike['timestamp']}\n"
+            body += f"   動画URL: https://www.youtube.com/watch?v={spike['動画ID']}\n\n"
         
-        # Gmailサーバーに接続して送信
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.send_message(msg)
-        
-        return True
+        body += "=" * 50 + "\n"
+    
+    body += f"通知日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}\n"
+    
+    # MIMEメッセージを作成
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = RECEIVER_EMAIL
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain', 'utf-8'))
+    return msg
+
+def deliver_notifications(outbox):
+    """送信待ちの通知を1回のSMTP接続でまとめて送信（チャンネルごとに1通）
     
+    送信できた分はその都度保存する（DELIVERY_TIMEOUT で待つのをやめて終了しても、
+    送信済みの通知を次回に再送しないため）。送信できなかった通知は送信待ちに残し、次回の実行で再送する。
+    """
+    grouped = outbox.pending_by_channel()
+    if not grouped:
+        return
+    
+    attempted = set()
+    dropped = 0
+    try:
+        with smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=SMTP_TIMEOUT) as server:
+            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+            for channel_name, items in grouped.items():
+                attempted.add(channel_name)
+                try:
+                    server.send_message(build_notification_message(items, channel_name))
+                except (smtplib.SMTPException, OSError) as e:
+                    # ソケットのタイムアウト等もこのチャンネルの失敗として数える（MAX_ATTEMPTS の対象）
+                    dropped += outbox.mark_failed(items, e)
+                    print(f"メール送信エラー: [{channel_name}] {str(e)}")
+                    continue
+                outbox.mark_sent(items)
+                outbox.save()
+                print(f"✉️ メール通知を送信しました: [{channel_name}] {len(items)}件")
     except Exception as e:
-        print(f"メール送信エラー: {str(e)}")
-        return False
+        # 接続・ログインの失敗：まだ送っていないチャンネルの分は全て次回に再送
+        remaining = [item for channel_name, items in grouped.items() if channel_name not in attempted for item in items]
+        dropped += outbox.mark_failed(remaining, e)
+        print(f"メール送信エラー: {str(e)}（{len(remaining)}件を次回再送）")
+    finally:
+        if dropped:
+            print(f"⚠️  {MAX_ATTEMPTS}回失敗した通知を{dropped}件破棄しました")
+        outbox.save()
+
+def run_delivery_stage(outbox):
+    """通知の送信（別スレッドで実行し、最大 DELIVERY_TIMEOUT 秒だけ待つ）
+    
+    時間内に終わらなければ待たずに終了する（送信待ちは保存済みなので次回再送される）。
+    """
+    pending_count = sum(len(items) for items in outbox.pending_by_channel().values())
+    if not pending_count:
+        return
+    print(f"\n✉️ 通知を送信中: {pending_count}件")
+    worker = threading.Thread(target=deliver_notifications, args=(outbox,), daemon=True)
+    worker.start()
+    worker.join(DELIVERY_TIMEOUT)
+    if worker.is_alive():
+        print(f"⚠️  メール送信が{DELIVERY_TIMEOUT}秒以内に終わらないため、残りは次回の実行で再送します")
 
 def get_channel_id(youtube, channel_url):
     """チャンネルURLからチャンネルIDを取得"""
@@ -252,127 +326,389 @@ def get_channel_id(youtube, channel_url):
         print(f"エラー: {str(e)}")
     return None
 
-def get_channel_stats(youtube, channel_id):
-    """チャンネルの統計情報を取得"""
-    try:
-        request = youtube.channels().list(
-            part='statistics,snippet',
-            id=channel_id
-        )
-        response = request.execute()
-        
-        if response['items']:
-            item = response['items'][0]
-            return {
-                'チャンネル名': item['snippet']['title'],
-                '登録者数': int(item['statistics']['subscriberCount']),
-                '総再生数': int(item['statistics']['viewCount']),
-                '動画数': int(item['statistics']['videoCount']),
-                '取得日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+def parse_channel_stats(item):
+    """channels.list のレスポンス項目からチャンネル統計を作成"""
+    return {
+        'チャンネル名': item['snippet']['title'],
+        '登録者数': int(item['statistics']['subscriberCount']),
+        '総再生数': int(item['statistics']['viewCount']),
+        '動画数': int(item['statistics']['videoCount']),
+        '取得日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+def prefetch_channels(youtube, channel_configs, resolved_ids=None):
+    """全チャンネルの統計とアップロードプレイリストIDをまとめて取得
+    
+    チャンネルIDを解決した後、channels.list を最大50チャンネルずつの
+    1リクエストで呼び出す（チャンネルごとの往復をなくす）。
+    
+    Args:
+        resolved_ids: 解決済みのチャンネルID {URL: チャンネルID}（解決した分を追加する。
+                      --watch で保持し、search.list を毎回呼ばないようにする）
+    
+    Returns:
+        {チャンネル名: {'channel_id', 'channel_stats', 'uploads_playlist_id'}}
+        （見つからなかったチャンネルは含まれない）
+    """
+    if resolved_ids is None:
+        resolved_ids = {}
+    channel_ids = {}
+    for channel_config in channel_configs:
+        channel_url = channel_config['url']
+        if channel_url not in resolved_ids:
+            channel_id = get_channel_id(youtube, channel_url)
+            if not channel_id:
+                continue
+            resolved_ids[channel_url] = channel_id
+        channel_ids[channel_config['name']] = resolved_ids[channel_url]
+    
+    unique_ids = list(dict.fromkeys(channel_ids.values()))
+    items = {}
+    for i in range(0, len(unique_ids), 50):
+        try:
+            response = youtube.channels().list(
+                part='snippet,statistics,contentDetails',
+                id=','.join(unique_ids[i:i + 50])
+            ).execute()
+            for item in response.get('items', []):
+                items[item['id']] = item
+        except Exception as e:
+            print(f"エラー: {str(e)}")
+    
+    prefetched = {}
+    for channel_name, channel_id in channel_ids.items():
+        item = items.get(channel_id)
+        if not item:
+            continue
+        try:
+            prefetched[channel_name] = {
+                'channel_id': channel_id,
+                'channel_stats': parse_channel_stats(item),
+                'uploads_playlist_id': item['contentDetails']['relatedPlaylists']['uploads']
             }
-    except Exception as e:
-        print(f"エラー: {str(e)}")
-    return None
+        except (KeyError, ValueError) as e:
+            print(f"エラー: {channel_name} のチャンネル情報を解析できませんでした ({str(e)})")
+    
+    print(f"✓ チャンネル情報を一括取得しました: {len(prefetched)}/{len(channel_configs)}")
+    return prefetched
 
-def get_all_videos(youtube, channel_id, channel_name, overrides):
-    """チャンネルの全動画情報を取得（並列Short判定版・例外設定対応）"""
+def extract_video_metadata(video, fetched_at):
+    """APIレスポンスからキャッシュ対象のメタデータ（タイプ判定に必要な項目）を取り出す
+    
+    Short判定の結果（'short'）は get_all_videos が判定時に追加する。
+    """
+    snippet = video.get('snippet', {})
+    entry = {
+        'snippet': {
+            'title': snippet.get('title', ''),
+            'publishedAt': snippet.get('publishedAt', ''),
+            'liveBroadcastContent': snippet.get('liveBroadcastContent', 'none')
+        },
+        'fetched_at': fetched_at
+    }
+    if 'contentDetails' in video:
+        entry['contentDetails'] = {'duration': video['contentDetails'].get('duration', '')}
+    if 'liveStreamingDetails' in video:
+        entry['liveStreamingDetails'] = video['liveStreamingDetails']
+    return entry
+
+def needs_full_fetch(entry, now):
+    """全項目の再取得が必要かどうか
+    
+    - 初見の動画
+    - 配信中/配信予定（タイトルや長さがまだ確定していない）
+    - 最終取得からMETADATA_REFRESH_HOURS以上経過（タイトル変更に追従）
+    """
+    if not entry:
+        return True
+    if entry['snippet'].get('liveBroadcastContent', 'none') in ('live', 'upcoming'):
+        return True
+    try:
+        fetched_at = datetime.strptime(entry['fetched_at'], '%Y-%m-%d %H:%M:%S')
+    except (KeyError, ValueError):
+        return True
+    return (now - fetched_at).total_seconds() >= METADATA_REFRESH_HOURS * 3600
+
+class CoalescedRequest:
+    """VideoRequestCoalescer に投入した1件の依頼（複数バッチにまたがる場合がある）"""
+    
+    def __init__(self, video_ids):
+        self._remaining = len(video_ids)
+        self._results = {}
+        self._error = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if self._remaining == 0:
+            self._done.set()
+    
+    def _resolve(self, video_id, item, error):
+        with self._lock:
+            if item is not None:
+                self._results[video_id] = item
+            if error is not None and self._error is None:
+                self._error = error
+            self._remaining -= 1
+            if self._remaining == 0:
+                self._done.set()
+    
+    def result(self):
+        """全バッチの完了を待って {動画ID: 動画データ} を返す"""
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._results
+
+class VideoRequestCoalescer:
+    """チャンネル横断で videos.list リクエストをまとめる
+    
+    全チャンネルから依頼された動画IDを (part, fields) ごとに溜め、
+    VIDEOS_LIST_BATCH件揃った分は即座に、揃わない分はCOALESCE_WINDOW秒
+    他チャンネルの依頼を待ってから1リクエストにまとめて取得し、
+    結果を依頼元に振り分ける。
+    """
+    
+    def __init__(self, youtube, window=COALESCE_WINDOW):
+        self.youtube = youtube
+        self.window = window
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._api_lock = threading.Lock()  # APIクライアントはスレッドセーフではない
+        self._pending = {}
+        self._timers = {}
+    
+    def submit(self, video_ids, part, fields=None):
+        """動画IDの取得を依頼する（結果は戻り値の result() で受け取る）"""
+        request = CoalescedRequest(video_ids)
+        key = (part, fields)
+        full_batches = []
+        
+        with self._lock:
+            queue = self._pending.setdefault(key, [])
+            queue.extend((video_id, request) for video_id in video_ids)
+            while len(queue) >= VIDEOS_LIST_BATCH:
+                full_batches.append(queue[:VIDEOS_LIST_BATCH])
+                del queue[:VIDEOS_LIST_BATCH]
+            if queue and key not in self._timers:
+                timer = threading.Timer(self.window, self._flush_key, args=(key,))
+                timer.daemon = True
+                self._timers[key] = timer
+                timer.start()
+        
+        for batch in full_batches:
+            self._execute(key, batch)
+        
+        return request
+    
+    def flush(self):
+        """溜まっている依頼を待ち時間なしで全て取得する"""
+        with self._lock:
+            keys = list(self._pending.keys())
+        for key in keys:
+            self._flush_key(key)
+    
+    def _flush_key(self, key):
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            batch = self._pending.pop(key, [])
+        if timer is not None:
+            timer.cancel()
+        for i in range(0, len(batch), VIDEOS_LIST_BATCH):
+            self._execute(key, batch[i:i + VIDEOS_LIST_BATCH])
+    
+    def _execute(self, key, batch):
+        """1バッチを取得して依頼元に振り分ける
+        
+        複数の依頼元をまとめたバッチが失敗した場合は、依頼元ごとに分けて取得し直す
+        （1チャンネル分の不正なIDなどで他のチャンネルまで失敗させないため）。
+        """
+        part, fields = key
+        video_ids = list(dict.fromkeys(video_id for video_id, _ in batch))
+        params = {'part': part, 'id': ','.join(video_ids)}
+        if fields:
+            params['fields'] = fields
+        
+        items = {}
+        error = None
+        try:
+            with self._api_lock:
+                self.request_count += 1
+                response = self.youtube.videos().list(**params).execute()
+            items = {item['id']: item for item in response.get('items', [])}
+        except Exception as e:
+            error = e
+        
+        if error is not None:
+            by_request = {}
+            for video_id, request in batch:
+                by_request.setdefault(request, []).append((video_id, request))
+            if len(by_request) > 1:
+                print(f"⚠️  videos.list のまとめ取得に失敗したため、依頼元ごとに取得し直します: {str(error)}")
+                for request_batch in by_request.values():
+                    self._execute(key, request_batch)
+                return
+        
+        for video_id, request in batch:
+            request._resolve(video_id, items.get(video_id), error)
+
+def fetch_video_details(coalescer, video_ids, metadata):
+    """動画の詳細情報を取得（メタデータキャッシュ対応）
+    
+    初見・要更新の動画のみ全項目を取得し、それ以外は statistics のみを
+    fields で絞り込んで取得してキャッシュ済みのメタデータと合成する。
+    リクエストは VideoRequestCoalescer を通して他チャンネル分とまとめて行う。
+    
+    Args:
+        coalescer: VideoRequestCoalescer
+        video_ids: 動画IDのリスト
+        metadata: メタデータキャッシュ（dict、取得結果で更新される）
+    
+    Returns:
+        APIの videos.list と同じ形式の動画データのリスト（video_idsの順）
+    """
+    now = datetime.now()
+    fetched_at = now.strftime('%Y-%m-%d %H:%M:%S')
+    full_ids = [vid for vid in video_ids if needs_full_fetch(metadata.get(vid), now)]
+    full_id_set = set(full_ids)
+    stats_ids = [vid for vid in video_ids if vid not in full_id_set]
+    
+    full_request = coalescer.submit(full_ids, FULL_VIDEO_PARTS)
+    stats_request = coalescer.submit(stats_ids, 'statistics', STATS_VIDEO_FIELDS)
+    
+    details = {}
+    
+    for video_id, video in full_request.result().items():
+        entry = extract_video_metadata(video, fetched_at)
+        # Shortかどうかは変わらないので、再取得しても判定結果は引き継ぐ
+        if 'short' in metadata.get(video_id, {}):
+            entry['short'] = metadata[video_id]['short']
+        metadata[video_id] = entry
+        details[video_id] = video
+    
+    for video_id, item in stats_request.result().items():
+        cached = metadata[video_id]
+        video = {
+            'id': video_id,
+            'snippet': cached['snippet'],
+            'statistics': item.get('statistics', {})
+        }
+        if 'contentDetails' in cached:
+            video['contentDetails'] = cached['contentDetails']
+        if 'liveStreamingDetails' in cached:
+            video['liveStreamingDetails'] = cached['liveStreamingDetails']
+        details[video_id] = video
+    
+    print(f"  - メタデータ: 全項目取得 {len(full_ids)}本 / 統計のみ {len(stats_ids)}本")
+    
+    return [details[vid] for vid in video_ids if vid in details]
+
+def discover_video_ids(youtube, playlist_id, known_ids):
+    """アップロードプレイリストから新着動画のIDを取得
+    
+    プレイリストは新しい順に並んでいるため、既知の動画IDを含むページに
+    到達した時点で走査を打ち切る（そのページ内の未知の動画は拾う）。
+    known_ids が空の場合はプレイリストを全件走査する。
+    
+    Returns:
+        (新着動画IDのリスト, 取得したページ数)
+    """
+    new_ids = []
+    pages = 0
+    next_page_token = None
+    
+    while True:
+        playlist_response = youtube.playlistItems().list(
+            part='snippet',
+            playlistId=playlist_id,
+            maxResults=50,
+            pageToken=next_page_token
+        ).execute()
+        pages += 1
+        
+        page_ids = [item['snippet']['resourceId']['videoId']
+                    for item in playlist_response['items']]
+        new_ids.extend(vid for vid in page_ids if vid not in known_ids)
+        
+        if any(vid in known_ids for vid in page_ids):
+            break
+        
+        next_page_token = playlist_response.get('nextPageToken')
+        if not next_page_token:
+            break
+    
+    return new_ids, pages
+
+def get_all_videos(youtube, coalescer, playlist_id, channel_name, overrides, known_ids, metadata, full_scan=False):
+    """チャンネルの全動画情報を取得（並列Short判定版・例外設定対応・メタデータキャッシュ対応）
+    
+    新着動画の検出はアップロードプレイリストを既知の動画に当たるまでだけ走査し、
+    既知の動画（ChannelState.known_video_ids）の統計はIDを指定して
+    まとめて取得する。full_scan=True の場合はプレイリストを全件走査する
+    （既知の動画に含まれていない動画の取りこぼしを拾う）。
+    
+    Args:
+        coalescer: videos.list をチャンネル横断でまとめる VideoRequestCoalescer
+        playlist_id: アップロードプレイリストID
+        known_ids: 既知の動画IDのリスト（新しい順）
+        metadata: メタデータキャッシュ（dict、取得結果で更新され、既知でなくなった動画は削除される）
+        full_scan: プレイリストを全件走査する
+    """
     videos = []
+    known_ids = list(known_ids)
+    known_set = set(known_ids)
     
     try:
-        # アップロードプレイリストIDを取得
-        request = youtube.channels().list(
-            part='contentDetails',
-            id=channel_id
-        )
-        response = request.execute()
+        # 新着動画を検出
+        listed_ids, pages = discover_video_ids(youtube, playlist_id, set() if full_scan else known_set)
+        new_ids = [vid for vid in listed_ids if vid not in known_set]
+        scan_label = '全件' if full_scan else f'{pages}ページ'
+        print(f"新着動画の検出: {len(new_ids)}本 (プレイリスト {scan_label}走査)")
         
-        if not response['items']:
-            return videos
+        video_ids = new_ids + known_ids
         
-        playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-        next_page_token = None
+        # 動画の詳細情報を取得（初見・要更新の動画のみ全項目、それ以外はstatisticsのみ）
+        print(f"取得中... {len(video_ids)}本の動画の統計を取得します")
+        fetched_videos = fetch_video_details(coalescer, video_ids, metadata)
         
-        while True:
-            playlist_request = youtube.playlistItems().list(
-                part='snippet',
-                playlistId=playlist_id,
-                maxResults=50,
-                pageToken=next_page_token
-            )
-            playlist_response = playlist_request.execute()
-            
-            video_ids = [item['snippet']['resourceId']['videoId'] 
-                        for item in playlist_response['items']]
-            
-            # 動画の詳細情報を取得（contentDetails追加）
-            videos_request = youtube.videos().list(
-                part='snippet,statistics,liveStreamingDetails,contentDetails',
-                id=','.join(video_ids)
-            )
-            videos_response = videos_request.execute()
-            
-            print(f"取得中... {len(videos)}本の動画を取得しました")
-            
-            # Short判定を並列実行（ここが改善点！）
-            short_cache = check_shorts_batch(video_ids)
-            
-            # 各動画のタイプを判定（キャッシュ・例外設定使用）
-            for video in videos_response['items']:
-                video_type = determine_video_type(video, short_cache, overrides, channel_name)
-                
-                video_data = {
-                    '動画ID': video['id'],
-                    'タイトル': video['snippet']['title'],
-                    '公開日': video['snippet']['publishedAt'][:10],
-                    '再生数': int(video['statistics'].get('viewCount', 0)),
-                    '高評価数': int(video['statistics'].get('likeCount', 0)),
-                    'コメント数': int(video['statistics'].get('commentCount', 0)),
-                    'type': video_type
-                }
-                videos.append(video_data)
+        # Short判定を並列実行（判定済みの動画はメタデータキャッシュの結果を使う）
+        unchecked_ids = [video['id'] for video in fetched_videos if 'short' not in metadata[video['id']]]
+        for video_id, is_short in check_shorts_batch(unchecked_ids).items():
+            if is_short is not None:
+                metadata[video_id]['short'] = is_short
+        short_cache = {video['id']: metadata[video['id']].get('short', False) for video in fetched_videos}
+        
+        # 各動画のタイプを判定（キャッシュ・例外設定使用）
+        for video in fetched_videos:
+            video_type = determine_video_type(video, short_cache, overrides, channel_name)
             
-            next_page_token = playlist_response.get('nextPageToken')
-            if not next_page_token:
-                break
+            video_data = {
+                '動画ID': video['id'],
+                'タイトル': video['snippet']['title'],
+                '公開日': video['snippet']['publishedAt'][:10],
+                '再生数': int(video['statistics'].get('viewCount', 0)),
+                '高評価数': int(video['statistics'].get('likeCount', 0)),
+                'コメント数': int(video['statistics'].get('commentCount', 0)),
+                'type': video_type
+            }
+            videos.append(video_data)
         
         print(f"✓ 完了: {len(videos)}本の動画を取得しました")
         print(f"  - Movie: {sum(1 for v in videos if v['type'] == 'Movie')}本")
         print(f"  - Short: {sum(1 for v in videos if v['type'] == 'Short')}本")
         print(f"  - LiveArchive: {sum(1 for v in videos if v['type'] == 'LiveArchive')}本")
         
+        # 既知でなくなった動画をキャッシュから除く（今回だけ取得できなかった動画は残す）
+        for video_id in set(metadata).difference(video_ids):
+            del metadata[video_id]
+        
     except Exception as e:
         print(f"エラー: {str(e)}")
     
     return videos
 
-def load_history(channel_name):
-    """過去のデータを読み込む"""
-    history_file = f'video_history_{channel_name}.json'
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-def save_history(videos, channel_stats, channel_name):
-    """現在のデータを保存（タイプ自動修正機能付き）"""
-    history_file = f'video_history_{channel_name}.json'
-    
-    # 既存データを読み込んでタイプ変更を検出
-    old_data = {}
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                old_history = json.load(f)
-                old_data = old_history.get('videos', {})
-        except:
-            pass
-    
-    # 新しいデータを作成
-    history_data = {
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+def build_history(videos, channel_stats, timestamp):
+    """前回値の記録（video_history）を作成"""
+    return {
+        'timestamp': timestamp,
         'channel_stats': channel_stats,
         'videos': {video['動画ID']: {
             '再生数': video['再生数'],
@@ -380,42 +716,11 @@ def save_history(videos, channel_stats, channel_name):
             'type': video['type']
         } for video in videos}
     }
-    
-    # タイプ変更をカウント（video_daily_historyと重複するが、整合性のため）
-    type_changes = 0
-    for video in videos:
-        video_id = video['動画ID']
-        if video_id in old_data:
-            old_type = old_data[video_id].get('type', 'Unknown')
-            new_type = video['type']
-            if old_type != new_type and old_type != 'Unknown':
-                type_changes += 1
-    
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(history_data, f, ensure_ascii=False, indent=2)
-    
-    if type_changes > 0:
-        print(f"履歴を保存しました: {history_file} ({type_changes}件のタイプ修正)")
-    else:
-        print(f"履歴を保存しました: {history_file}")
 
-def save_log(videos, channel_stats, achievements, channel_name):
-    """ログファイルに追記"""
-    log_file = f'check_log_{channel_name}.json'
-    
-    # 既存ログを読み込み
-    if os.path.exists(log_file):
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-        except:
-            logs = []
-    else:
-        logs = []
-    
-    # 新しいログエントリを追加
+def append_log(logs, videos, channel_stats, achievements, timestamp):
+    """ログエントリを追加（最新100件のみ保持）"""
     log_entry = {
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'timestamp': timestamp,
         'channel_stats': channel_stats,
         'total_videos': len(videos),
         'movie_count': sum(1 for v in videos if v['type'] == 'Movie'),
@@ -424,35 +729,20 @@ def save_log(videos, channel_stats, achievements, channel_name):
         'achievements': achievements
     }
     logs.append(log_entry)
-    
-    # 最新100件のみ保持
-    logs = logs[-100:]
-    
-    # 保存
-    with open(log_file, 'w', encoding='utf-8') as f:
-        json.dump(logs, f, ensure_ascii=False, indent=2)
-    print(f"ログを保存しました: {log_file}")
+    return logs[-100:]
 
-def save_video_daily_history(videos, channel_name):
-    """動画ごとの履歴を保存（タイプ自動修正機能付き）"""
-    history_file = f'video_daily_history_{channel_name}.json'
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+def append_video_daily_history(history, videos, timestamp, spike_detector=None):
+    """動画ごとの履歴にレコードを追加（タイプ自動修正機能付き）
     
-    # 既存履歴を読み込み
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-        except:
-            history = {}
-    else:
-        history = {}
+    値が前回から変わっていない動画はレコードを追加せず、最終確認時刻のみ更新する。
+    spike_detector を渡すと、各動画の今回の再生数で急上昇の検出状態も更新する（1本あたりO(1)）。
     
-    # タイプ変更のカウンター
-    type_changes = {'Movie': 0, 'Short': 0, 'LiveArchive': 0}
+    Returns:
+        タイプ変更の詳細リスト
+    """
     type_change_details = []
+    add_run(history, timestamp)
     
-    # 各動画の履歴を追加
     for video in videos:
         video_id = video['動画ID']
         new_type = video['type']
@@ -463,7 +753,7 @@ def save_video_daily_history(videos, channel_name):
                 'タイトル': video['タイトル'],
                 '公開日': video['公開日'],
                 'type': new_type,
-                'records': []
+                'records': MetricSeries()
             }
         else:
             # 既存動画：タイプをチェック
@@ -472,7 +762,6 @@ def save_video_daily_history(videos, channel_name):
             if old_type != new_type:
                 # タイプが変更された
                 print(f"  🔄 タイプ修正: [{video['タイトル'][:40]}...] {old_type} → {new_type}")
-                type_changes[new_type] += 1
                 type_change_details.append({
                     'タイトル': video['タイトル'],
                     '動画ID': video_id,
@@ -482,32 +771,212 @@ def save_video_daily_history(videos, channel_name):
                 # タイプを更新
                 history[video_id]['type'] = new_type
         
-        # 新しいレコードを追加
-        history[video_id]['records'].append({
-            'timestamp': timestamp,
-            '再生数': video['再生数'],
-            '高評価数': video['高評価数'],
-            'コメント数': video['コメント数']
-        })
+        # 新しいレコードを追加（変化がなければ最終確認時刻のみ更新）
+        append_observation(history[video_id], timestamp,
+                           (video['再生数'], video['高評価数'], video['コメント数']))
+        if spike_detector is not None:
+            spike_detector.observe(video, timestamp)
         
         # タイトルを更新（変更された場合に対応）
         history[video_id]['タイトル'] = video['タイトル']
     
-    # 保存
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
-    print(f"動画別履歴を保存しました: {history_file}")
-    
-    # タイプ変更があった場合は集計を表示
-    if any(count > 0 for count in type_changes.values()):
-        total_changes = sum(type_changes.values())
-        print(f"\n📝 タイプ修正サマリー: {total_changes}件")
-        if type_changes['Movie'] > 0:
-            print(f"  → Movie: {type_changes['Movie']}件")
-        if type_changes['Short'] > 0:
-            print(f"  → Short: {type_changes['Short']}件")
-        if type_changes['LiveArchive'] > 0:
-            print(f"  → LiveArchive: {type_changes['LiveArchive']}件")
+    return type_change_details
+
+def print_type_change_summary(type_change_details):
+    """タイプ変更の集計を表示"""
+    if not type_change_details:
+        return
+    print(f"\n📝 タイプ修正サマリー: {len(type_change_details)}件")
+    for video_type in ('Movie', 'Short', 'LiveArchive'):
+        count = sum(1 for d in type_change_details if d['新タイプ'] == video_type)
+        if count > 0:
+            print(f"  → {video_type}: {count}件")
+
+class ChannelState:
+    """1チャンネル分の永続データ
+    
+    video_history / check_log / video_daily_history / video_metadata の各ファイルは
+    1回の実行で高々1回だけ読み込む。キリ番とタイプ変更はメモリ上の同じデータから
+    1回だけ判定し、flush() でまとめて書き出す。
+    --watch では同じインスタンスを実行をまたいで使い回し、ファイルは起動後の最初の1回だけ読み込む。
+    """
+    
+    def __init__(self, channel_name):
+        self.channel_name = channel_name
+        self.history_file = f'video_history_{channel_name}.json'
+        self.log_file = f'check_log_{channel_name}.json'
+        self.daily_history_file = f'video_daily_history_{channel_name}.json'
+        self.metadata_file = f'video_metadata_{channel_name}.json'
+        self.spike_state_file = spike_state_file_path(channel_name)
+        self._history = None
+        self._logs = None
+        self._daily_history = None
+        self._metadata = None
+        self._spike_detector = None
+        self._stats_entry = None
+        self._timestamp = None
+        self._achievements = []
+        self._dirty = False
+        self._full_dirty = False
+        self.type_changes = []
+    
+    @property
+    def history(self):
+        """前回値の記録（video_history_{name}.json）"""
+        if self._history is None:
+            self._history = load_json(self.history_file, {})
+        return self._history
+    
+    @property
+    def logs(self):
+        """実行ログ（check_log_{name}.json）"""
+        if self._logs is None:
+            self._logs = load_json(self.log_file, [])
+        return self._logs
+    
+    @property
+    def daily_history(self):
+        """動画別履歴（video_daily_history_{name}.json）"""
+        if self._daily_history is None:
+            self._daily_history = load_daily_history(self.daily_history_file)
+        return self._daily_history
+    
+    @property
+    def metadata(self):
+        """動画メタデータキャッシュ（video_metadata_{name}.json）"""
+        if self._metadata is None:
+            self._metadata = load_json(self.metadata_file, {})
+        return self._metadata
+    
+    @property
+    def spike_detector(self):
+        """再生数の急上昇の検出状態（view_spike_state_{name}.json）"""
+        if self._spike_detector is None:
+            self._spike_detector = ViewSpikeDetector.load(self.spike_state_file)
+        return self._spike_detector
+    
+    @property
+    def spikes(self):
+        """今回の実行で検出した急上昇"""
+        return self.spike_detector.spikes
+    
+    @property
+    def timestamp(self):
+        """今回の実行時刻（record_run の前はNone）"""
+        return self._timestamp
+    
+    def known_video_ids(self, now=None):
+        """記録済みの動画ID（前回取得できた動画を新しい順に、続いて動画別履歴にだけある動画）
+        
+        一時的に取得できなかった・非公開になった動画も、最終確認から KNOWN_RETENTION_DAYS 日は
+        既知として統計を取得し続ける（プレイリストの走査は既知の動画で打ち切るため、
+        既知から外すと再び公開されても拾えなくなる）。
+        """
+        now = now or datetime.now()
+        cutoff = (now - timedelta(days=KNOWN_RETENTION_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+        known_ids = list(self.history.get('videos', {}).keys())
+        listed = set(known_ids)
+        unseen = [(video_info.get('公開日', ''), video_id) for video_id, video_info in iter_videos(self.daily_history)
+                  if video_id not in listed and video_info.get('last_seen', '') >= cutoff]
+        unseen.sort(reverse=True)
+        return known_ids + [video_id for _, video_id in unseen]
+    
+    def needs_full_scan(self, now=None):
+        """プレイリストを全件走査するか（FULL_SCAN=true、または今日まだ全件走査していない）"""
+        if FULL_SCAN:
+            return True
+        now = now or datetime.now()
+        return self.history.get('last_full_scan', '')[:10] != now.strftime('%Y-%m-%d')
+    
+    def record_run(self, videos, channel_stats, full_scan=False):
+        """今回の取得結果をメモリ上のデータに反映する
+        
+        Args:
+            full_scan: 今回プレイリストを全件走査した（次回以降の needs_full_scan の判定に使う）
+        
+        Returns:
+            キリ番達成のリスト
+        """
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        last_full_scan = timestamp if full_scan else self.history.get('last_full_scan')
+        achievements = check_milestones(videos, self.history)
+        self.spike_detector.spikes = []
+        self.type_changes = append_video_daily_history(self.daily_history, videos, timestamp, self.spike_detector)
+        self._logs = append_log(self.logs, videos, channel_stats, achievements, timestamp)
+        self._history = build_history(videos, channel_stats, timestamp)
+        if last_full_scan:
+            self._history['last_full_scan'] = last_full_scan
+        self._stats_entry = make_entry(timestamp, channel_stats, {
+            'movie_count': sum(1 for v in videos if v['type'] == 'Movie'),
+            'short_count': sum(1 for v in videos if v['type'] == 'Short'),
+            'archive_count': sum(1 for v in videos if v['type'] == 'LiveArchive')
+        })
+        self._timestamp = timestamp
+        self._achievements = achievements
+        self._dirty = True
+        self._full_dirty = True
+        return achievements
+    
+    def flush(self, full=True):
+        """メモリ上のデータをまとめて書き出す
+        
+        full=False の場合は前回値・実行ログと追記のみのファイルだけを書き出し、
+        動画別履歴・急上昇の検出状態・メタデータキャッシュ（大きいファイル）は
+        次の flush(full=True) までメモリ上に保持する（--watch で実行ごとの書き出しを減らすため）。
+        """
+        if self._dirty:
+            self._flush_run()
+        if full and self._full_dirty:
+            self._flush_full()
+    
+    def _flush_run(self):
+        """今回の実行分（前回値・実行ログ・追記のみのファイル）を書き出す"""
+        save_json(self.history_file, self._history)
+        if self.type_changes:
+            print(f"履歴を保存しました: {self.history_file} ({len(self.type_changes)}件のタイプ修正)")
+        else:
+            print(f"履歴を保存しました: {self.history_file}")
+        
+        save_json(self.log_file, self._logs)
+        print(f"ログを保存しました: {self.log_file}")
+        
+        # チャンネル統計の長期推移（初回は実行ログから過去分を取り込む）
+        if not has_channel_stats(self.channel_name):
+            backfilled = backfill_channel_stats(self.channel_name, self._logs[:-1])
+            if backfilled:
+                print(f"チャンネル統計ストアを作成しました: 実行ログから{backfilled}件を取り込み")
+        append_channel_stats(self.channel_name, self._stats_entry)
+        print(f"チャンネル統計を追記しました: channel_stats_{self.channel_name}.jsonl")
+        
+        # キリ番達成の履歴（初回は動画別履歴から過去分を作り直す）
+        if not has_milestone_events(self.channel_name):
+            rebuilt = rebuild_milestone_events(
+                self.channel_name,
+                ((video_id, video_info['records']) for video_id, video_info in iter_videos(self._daily_history))
+            )
+            print(f"キリ番達成履歴を作成しました: 動画別履歴から{rebuilt}件")
+        elif self._achievements:
+            append_milestone_events(self.channel_name, self._timestamp, self._achievements)
+            print(f"キリ番達成履歴を追記しました: {len(self._achievements)}件")
+        
+        if self._spike_detector.spikes:
+            append_spike_events(self.channel_name, self._spike_detector.spikes)
+            print(f"再生数の急上昇を記録しました: {len(self._spike_detector.spikes)}件")
+        
+        print_type_change_summary(self.type_changes)
+        self._dirty = False
+    
+    def _flush_full(self):
+        """動画別履歴・急上昇の検出状態・メタデータキャッシュを書き出す"""
+        save_daily_history(self.daily_history_file, self._daily_history)
+        print(f"動画別履歴を保存しました: {self.daily_history_file}")
+        
+        self._spike_detector.save(self.spike_state_file)
+        
+        if self._metadata is not None:
+            save_json(self.metadata_file, self._metadata)
+            print(f"メタデータキャッシュを保存しました: {self.metadata_file}")
+        self._full_dirty = False
 
 def check_milestones(current_videos, history):
     """キリ番達成をチェック（再生数・高評価数）"""
@@ -557,8 +1026,18 @@ def check_milestones(current_videos, history):
     
     return achievements
 
-def process_channel(youtube, channel_config, overrides):
-    """1つのチャンネルを処理（例外設定対応）"""
+def process_channel(youtube, coalescer, channel_config, overrides, channel_info, outbox=None,
+                    state=None, full_flush=True):
+    """1つのチャンネルを処理（例外設定対応）
+    
+    Args:
+        youtube: このスレッド専用のAPIクライアント（YouTubeClientPool から取得）
+        coalescer: 全チャンネル共有の VideoRequestCoalescer
+        channel_info: prefetch_channels で取得したチャンネル情報（見つからなかった場合はNone）
+        outbox: 通知の送信待ちキュー（メール通知が無効ならNone）
+        state: 実行をまたいで保持している ChannelState（Noneならファイルから読み込む）
+        full_flush: Falseなら大きいファイルの書き出しを後回しにする（ChannelState.flush を参照）
+    """
     channel_name = channel_config['name']
     channel_url = channel_config['url']
     
@@ -566,42 +1045,35 @@ def process_channel(youtube, channel_config, overrides):
     print(f"処理中: {channel_name}")
     print("=" * 50)
     
-    # チャンネルIDを取得
     print(f"\nチャンネルURL: {channel_url}")
-    channel_id = get_channel_id(youtube, channel_url)
     
-    if not channel_id:
+    if not channel_info:
         print(f"❌ エラー: {channel_name} のチャンネルが見つかりませんでした")
         return False
     
-    print(f"チャンネルID: {channel_id}")
-    
-    # チャンネル統計を取得
-    print("\nチャンネル情報を取得中...")
-    channel_stats = get_channel_stats(youtube, channel_id)
-    
-    if not channel_stats:
-        print(f"❌ エラー: {channel_name} のチャンネル情報を取得できませんでした")
-        return False
-    
+    channel_stats = channel_info['channel_stats']
+    print(f"チャンネルID: {channel_info['channel_id']}")
     print(f"チャンネル名: {channel_stats['チャンネル名']}")
     print(f"登録者数: {channel_stats['登録者数']:,}人")
     print(f"総再生数: {channel_stats['総再生数']:,}回")
     print(f"動画数: {channel_stats['動画数']:,}本")
     
-    # 全動画情報を取得（例外設定を渡す）
+    # 永続データ（既知の動画IDは統計をIDで直接取得する）
+    if state is None:
+        state = ChannelState(channel_name)
+    
+    # 全動画情報を取得（例外設定を渡す、1日の最初の実行ではプレイリストを全件走査する）
     print("\n全動画情報を取得中...")
-    videos = get_all_videos(youtube, channel_id, channel_name, overrides)
+    full_scan = state.needs_full_scan()
+    videos = get_all_videos(youtube, coalescer, channel_info['uploads_playlist_id'], channel_name, overrides,
+                            state.known_video_ids(), state.metadata, full_scan)
     
     if not videos:
         print(f"❌ エラー: {channel_name} の動画情報を取得できませんでした")
         return False
     
-    # 履歴を読み込み
-    history = load_history(channel_name)
-    
-    # キリ番チェック
-    achievements = check_milestones(videos, history)
+    # 今回の結果を反映（キリ番チェック・タイプ修正）
+    achievements = state.record_run(videos, channel_stats, full_scan)
     
     if achievements:
         print(f"\n🎉 キリ番達成: {len(achievements)}件")
@@ -610,25 +1082,322 @@ def process_channel(youtube, channel_config, overrides):
             unit = "回" if metric_type == "再生数" else "件"
             print(f"  - {achievement['タイトル']}: {metric_type} {achievement['キリ番']:,}{unit}突破 [{achievement['type']}]")
         
-        # メール通知
-        if EMAIL_ENABLED:
-            if send_email_notification(achievements, channel_name):
-                print("✉️ メール通知を送信しました")
     else:
         print("\n新しいキリ番達成はありませんでした")
     
-    # データを保存
-    save_history(videos, channel_stats, channel_name)
-    save_log(videos, channel_stats, achievements, channel_name)
-    save_video_daily_history(videos, channel_name)
+    spikes = state.spikes
+    if spikes:
+        print(f"\n🚀 再生数の急上昇: {len(spikes)}件")
+        for spike in spikes:
+            print(f"  - {spike['タイトル']}: +{spike['日速']:,}回/日（平常時 +{spike['平常時の日速']:,}回/日） [{spike['type']}]")
+    
+    # メール通知（送信は全チャンネルの処理後にまとめて行う）
+    if outbox is not None and (achievements or spikes):
+        queued = outbox.enqueue(channel_name, achievements + spikes, state.timestamp)
+        print(f"✉️ メール通知を送信待ちに追加しました: {queued}件")
+    
+    # データをまとめて保存
+    state.flush(full=full_flush)
     
     print(f"\n✓ {channel_name} の処理完了")
     return True
 
-def main():
+class ThreadOutputRouter(io.TextIOBase):
+    """スレッドごとに標準出力をバッファリングする
+    
+    チャンネルを並列処理するとログが混ざるため、各スレッドの出力を溜めて
+    チャンネルの処理完了時にまとめて書き出す。
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+    
+    def start_buffer(self):
+        self._local.buffer = io.StringIO()
+    
+    def release_buffer(self):
+        buffer = getattr(self._local, 'buffer', None)
+        self._local.buffer = None
+        if buffer is not None:
+            with self._lock:
+                self.stream.write(buffer.getvalue())
+                self.stream.flush()
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+        with self._lock:
+            return self.stream.write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+class YouTubeClientPool:
+    """スレッドごとの YouTube API クライアント
+    
+    APIクライアント（httplib2）はスレッドセーフではないため、ワーカースレッドごとに
+    1つ作成し、同じスレッドで処理するチャンネル・実行の間で使い回す。
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def get(self):
+        youtube = getattr(self._local, 'youtube', None)
+        if youtube is None:
+            youtube = self._local.youtube = build('youtube', 'v3', developerKey=API_KEY)
+        return youtube
+
+def run_channel_worker(router, clients, coalescer, channel_config, overrides, channel_info, outbox,
+                       state=None, full_flush=True):
+    """ワーカースレッドで1チャンネルを処理（ログはチャンネル単位でまとめて出力）"""
+    router.start_buffer()
+    try:
+        return process_channel(clients.get(), coalescer, channel_config, overrides, channel_info, outbox,
+                               state, full_flush)
+    except Exception as e:
+        print(f"❌ エラー: {channel_config['name']} の処理中に例外が発生しました: {str(e)}")
+        return False
+    finally:
+        router.release_buffer()
+
+def run_channels(executor, clients, coalescer, channel_configs, overrides, prefetched, outbox,
+                 states=None, full_flush=True):
+    """各チャンネルを並列処理（videos.list はチャンネル横断でまとめる）
+    
+    Args:
+        states: {チャンネル名: ChannelState}（--watch で実行をまたいで保持する。Noneなら毎回読み込む）
+    
+    Returns:
+        成功したチャンネル数
+    """
+    router = ThreadOutputRouter(sys.stdout)
+    sys.stdout = router
+    success_count = 0
+    try:
+        futures = [
+            executor.submit(run_channel_worker, router, clients, coalescer, channel_config,
+                            overrides, prefetched.get(channel_config['name']), outbox,
+                            states.get(channel_config['name']) if states is not None else None, full_flush)
+            for channel_config in channel_configs
+        ]
+        for future in as_completed(futures):
+            if future.result():
+                success_count += 1
+    finally:
+        try:
+            coalescer.flush()
+        finally:
+            sys.stdout = router.stream
+    return success_count
+
+def channel_interval_minutes(channel_config, default_minutes):
+    """チャンネルのチェック間隔（分）：チャンネル設定の interval、なければ既定値"""
+    value = channel_config.get('interval', default_minutes)
+    try:
+        minutes = float(value)
+    except (TypeError, ValueError):
+        minutes = 0
+    if minutes <= 0:
+        print(f"⚠️  {channel_config['name']} のチェック間隔が不正です: {value}（{default_minutes}分を使用）")
+        return default_minutes
+    return minutes
+
+class ChannelWatcher:
+    """--watch モード：チャンネルごとの間隔で繰り返しチェックする常駐処理
+    
+    APIクライアント・HTTP接続・ワーカースレッド・videos.list の合流・チャンネルの永続データ
+    （ChannelState）・解決済みのチャンネルID・通知の送信待ちを実行をまたいでメモリ上に保持する。
+    同じ時刻にチェック時期が来たチャンネルは1回の実行にまとめて並列処理する。
+    
+    前回値・実行ログと追記のみのファイルは実行ごとに書き出し、動画別履歴などの大きいファイルは
+    persist_minutes ごと（と終了時）にまとめて書き出す。
+    """
+    
+    def __init__(self, channel_configs, interval_minutes=WATCH_INTERVAL_MINUTES,
+                 persist_minutes=WATCH_PERSIST_MINUTES):
+        self.channel_configs = {channel_config['name']: channel_config for channel_config in channel_configs}
+        self.intervals = {name: channel_interval_minutes(channel_config, interval_minutes) * 60
+                          for name, channel_config in self.channel_configs.items()}
+        self.persist_seconds = persist_minutes * 60
+        self.states = {name: ChannelState(name) for name in self.channel_configs}
+        self.resolved_ids = {}
+        self.clients = YouTubeClientPool()
+        self.youtube = build('youtube', 'v3', developerKey=API_KEY)
+        self.coalescer = VideoRequestCoalescer(self.youtube)
+        self.outbox = NotificationOutbox() if EMAIL_ENABLED else None
+        self.executor = ThreadPoolExecutor(max_workers=CHANNEL_WORKERS)
+        self.scheduler = sched.scheduler(time.monotonic, time.sleep)
+        self.poll_count = 0
+        self._stop = threading.Event()
+        self._delivery = None
+        self._last_persist = time.monotonic()
+    
+    def stop(self):
+        """実行中のチェックが終わった時点で停止する（シグナルハンドラからも呼べる）"""
+        self._stop.set()
+    
+    def run(self):
+        """停止するまでスケジュールに従ってチェックを繰り返す"""
+        now = time.monotonic()
+        for name in self.channel_configs:
+            self.scheduler.enterabs(now, 0, self._run_due, (name,))
+        try:
+            while not self._stop.is_set():
+                delay = self.scheduler.run(blocking=False)
+                if delay is None:
+                    break
+                self._stop.wait(delay)
+        finally:
+            self.shutdown()
+    
+    def _run_due(self, channel_name):
+        """チェック時期が来たチャンネルをまとめて処理し、次回を予約する"""
+        now = time.monotonic()
+        due = [channel_name]
+        for event in self.scheduler.queue:
+            if event.time <= now:
+                self.scheduler.cancel(event)
+                due.append(event.argument[0])
+        
+        started = time.monotonic()
+        self.poll(due)
+        # 間隔は開始時刻から数える（処理が間隔より長引いた場合は次回をすぐに実行）
+        for name in due:
+            self.scheduler.enterabs(started + self.intervals[name], 0, self._run_due, (name,))
+    
+    def poll(self, channel_names):
+        """指定したチャンネルを1回チェックする"""
+        self.poll_count += 1
+        configs = [self.channel_configs[name] for name in channel_names]
+        print("\n" + "=" * 50)
+        print(f"チェック #{self.poll_count}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+              f"（{', '.join(channel_names)}）")
+        print("=" * 50)
+        
+        # 例外設定は編集を反映するため毎回読み込む（小さいファイル）
+        overrides = load_video_type_overrides()
+        prefetched = prefetch_channels(self.youtube, configs, self.resolved_ids)
+        request_count = self.coalescer.request_count
+        success_count = run_channels(self.executor, self.clients, self.coalescer, configs, overrides,
+                                     prefetched, self.outbox, self.states, full_flush=False)
+        print(f"\nvideos.list 呼び出し回数: {self.coalescer.request_count - request_count}回")
+        
+        if time.monotonic() - self._last_persist >= self.persist_seconds:
+            self.persist()
+        
+        if self.outbox is not None:
+            self.outbox.save()
+            self.start_delivery()
+        
+        print(f"\n✓ チェック #{self.poll_count} 完了: {success_count}/{len(configs)} チャンネル成功")
+    
+    def persist(self):
+        """メモリ上に保持している大きいファイルを全チャンネル分書き出す"""
+        for state in self.states.values():
+            state.flush()
+        self._last_persist = time.monotonic()
+    
+    def start_delivery(self):
+        """通知の送信を別スレッドで開始（前回の送信が続いている間は次回に回す）"""
+        if self._delivery is not None and self._delivery.is_alive():
+            print("⚠️  前回の通知の送信が終わっていないため、今回の分は次回に送信します")
+            return
+        pending_count = sum(len(items) for items in self.outbox.pending_by_channel().values())
+        if not pending_count:
+            return
+        print(f"\n✉️ 通知を送信中: {pending_count}件")
+        self._delivery = threading.Thread(target=deliver_notifications, args=(self.outbox,), daemon=True)
+        self._delivery.start()
+    
+    def shutdown(self):
+        """保持しているデータを書き出して終了する"""
+        print("\n常駐モードを終了します: データを保存中...")
+        self.persist()
+        self.executor.shutdown(wait=True)
+        if self.outbox is not None:
+            if self._delivery is not None:
+                self._delivery.join(DELIVERY_TIMEOUT)
+                if self._delivery.is_alive():
+                    print(f"⚠️  メール送信が{DELIVERY_TIMEOUT}秒以内に終わらないため、残りは次回の起動時に再送します")
+            self.outbox.save()
+        print(f"✓ 常駐モードを終了しました（チェック {self.poll_count}回）")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='YouTube チャンネル統計 自動チェック')
+    parser.add_argument('--watch', action='store_true',
+                        help='常駐してチャンネルごとの間隔で繰り返しチェックする')
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL_MINUTES,
+                        help=f'--watch の既定のチェック間隔（分、チャンネル設定の interval が優先、既定: {WATCH_INTERVAL_MINUTES}）')
+    parser.add_argument('--persist-interval', type=float, default=WATCH_PERSIST_MINUTES,
+                        help=f'--watch で動画別履歴などの大きいファイルを書き出す間隔（分、既定: {WATCH_PERSIST_MINUTES}）')
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error('--interval は0より大きい値を指定してください')
+    if args.persist_interval < 0:
+        parser.error('--persist-interval は0以上の値を指定してください')
+    return args
+
+def watch(args):
+    """--watch：停止（Ctrl+C / SIGTERM）するまで繰り返しチェックする"""
+    watcher = ChannelWatcher(CHANNELS, args.interval, args.persist_interval)
+    for name in watcher.channel_configs:
+        print(f"  - {name}: {watcher.intervals[name] / 60:g}分ごと")
+    print(f"大きいファイルの書き出し: {args.persist_interval:g}分ごと")
+    
+    def handle_signal(signum, frame):
+        print(f"\nシグナルを受信しました（{signal.Signals(signum).name}）: 実行中のチェックの完了後に終了します")
+        watcher.stop()
+    
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    watcher.run()
+
+def check_once():
+    """全チャンネルを1回チェックする"""
+    # 例外設定を読み込み
+    print("\n例外設定を読み込み中...")
+    overrides = load_video_type_overrides()
+    
+    # YouTube API クライアントを作成
+    youtube = build('youtube', 'v3', developerKey=API_KEY)
+    
+    # 全チャンネルの統計・アップロードプレイリストIDを一括取得
+    print("\nチャンネル情報を一括取得中...")
+    prefetched = prefetch_channels(youtube, CHANNELS)
+    
+    # 通知は送信待ちに積み、最後にまとめて送信する（前回送れなかった分も含む）
+    outbox = NotificationOutbox() if EMAIL_ENABLED else None
+    
+    # 各チャンネルを並列処理（videos.list はチャンネル横断でまとめる）
+    coalescer = VideoRequestCoalescer(youtube)
+    with ThreadPoolExecutor(max_workers=CHANNEL_WORKERS) as executor:
+        success_count = run_channels(executor, YouTubeClientPool(), coalescer, CHANNELS, overrides,
+                                     prefetched, outbox)
+    
+    print(f"\nvideos.list 呼び出し回数: {coalescer.request_count}回")
+    
+    # 通知の送信（データの保存はすべて完了済み）
+    if outbox is not None:
+        outbox.save()
+        run_delivery_stage(outbox)
+    
+    print("\n" + "=" * 50)
+    print(f"✓ 全処理完了: {success_count}/{len(CHANNELS)} チャンネル成功")
+    print("=" * 50)
+
+def main(argv=None):
     """メイン処理"""
+    args = parse_args(argv)
+    
     print("=" * 50)
-    print("YouTube統計 自動チェック開始（複数チャンネル対応）")
+    if args.watch:
+        print("YouTube統計 自動チェック開始（常駐モード）")
+    else:
+        print("YouTube統計 自動チェック開始（複数チャンネル対応）")
     print(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 50)
     
@@ -641,25 +1410,13 @@ def main():
         return
     
     print(f"\n処理対象チャンネル数: {len(CHANNELS)}")
+    if args.watch:
+        watch(args)
+        return
     for ch in CHANNELS:
         print(f"  - {ch['name']}")
     
-    # 例外設定を読み込み
-    print("\n例外設定を読み込み中...")
-    overrides = load_video_type_overrides()
-    
-    # YouTube API クライアントを作成
-    youtube = build('youtube', 'v3', developerKey=API_KEY)
-    
-    # 各チャンネルを処理
-    success_count = 0
-    for channel_config in CHANNELS:
-        if process_channel(youtube, channel_config, overrides):
-            success_count += 1
-    
-    print("\n" + "=" * 50)
-    print(f"✓ 全処理完了: {success_count}/{len(CHANNELS)} チャンネル成功")
-    print("=" * 50)
+    check_once()
 
 if __name__ == '__main__':
     main()
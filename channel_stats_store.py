@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+チャンネル統計の時系列ストア（登録者数・総再生数・動画数・タイプ別本数）
+
+実行ログ（check_log_*.json、最新100件のみ）とは別に、長期の推移を保存する。
+どちらのファイルも1行1レコードのJSON Lines形式で、実行ごとの書き込みは追記のみ。
+
+- channel_stats_{name}.jsonl       : 実行ごとのレコード（直近RAW_RETENTION_DAYS日分）
+- channel_stats_daily_{name}.jsonl : 1日1レコード（その日の最終レコード、全期間）
+
+日付が変わって最初の実行で前日の最終レコードを日次ファイルに追記し、
+保持期間を過ぎた実行ごとのレコードを削除する（対象は直近分のみなので一定コスト）。
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from storage import append_line, encode_line, load_json, read_last_line, read_lines, write_bytes_atomic
+
+RAW_RETENTION_DAYS = 30  # 実行ごとのレコードを残す日数
+STATS_KEYS = ('登録者数', '総再生数', '動画数', 'movie_count', 'short_count', 'archive_count')
+
+def raw_file_path(channel_name):
+    return f'channel_stats_{channel_name}.jsonl'
+
+def daily_file_path(channel_name):
+    return f'channel_stats_daily_{channel_name}.jsonl'
+
+def make_entry(timestamp, channel_stats, type_counts):
+    """チャンネル統計とタイプ別本数からレコードを作成"""
+    entry = {'timestamp': timestamp}
+    for key in ('登録者数', '総再生数', '動画数'):
+        entry[key] = channel_stats.get(key, 0)
+    entry.update(type_counts)
+    return entry
+
+def rollover(channel_name, today):
+    """前日までの実行ごとのレコードを日次ファイルに移し、保持期間外を削除"""
+    raw_file = raw_file_path(channel_name)
+    entries = read_lines(raw_file)
+    if not entries:
+        return
+    
+    daily_last = read_last_line(daily_file_path(channel_name))
+    last_daily_date = daily_last['timestamp'][:10] if daily_last else ''
+    
+    # 完了した日ごとの最終レコードを日次ファイルに追記
+    last_by_date = {}
+    for entry in entries:
+        date_key = entry['timestamp'][:10]
+        if date_key < today:
+            last_by_date[date_key] = entry
+    for date_key in sorted(last_by_date):
+        if date_key > last_daily_date:
+            append_line(daily_file_path(channel_name), last_by_date[date_key])
+    
+    # 保持期間を過ぎたレコードを削除
+    cutoff = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=RAW_RETENTION_DAYS)).strftime('%Y-%m-%d')
+    kept = [entry for entry in entries if entry['timestamp'][:10] >= cutoff]
+    if len(kept) != len(entries):
+        write_bytes_atomic(raw_file, b''.join(encode_line(entry) for entry in kept))
+
+def append_channel_stats(channel_name, entry):
+    """1回分のレコードを追記（日付が変わっていれば日次ファイルへの移動も行う）"""
+    today = entry['timestamp'][:10]
+    last = read_last_line(raw_file_path(channel_name))
+    if last and last['timestamp'][:10] < today:
+        rollover(channel_name, today)
+    append_line(raw_file_path(channel_name), entry)
+
+def has_channel_stats(channel_name):
+    return os.path.exists(raw_file_path(channel_name)) or os.path.exists(daily_file_path(channel_name))
+
+def backfill_channel_stats(channel_name, logs):
+    """実行ログ（check_log）から過去のレコードを取り込む（ストア作成時のみ）"""
+    entries = []
+    for log in logs:
+        if 'timestamp' not in log or 'channel_stats' not in log:
+            continue
+        entries.append(make_entry(log['timestamp'], log['channel_stats'], {
+            'movie_count': log.get('movie_count', 0),
+            'short_count': log.get('short_count', 0),
+            'archive_count': log.get('archive_count', 0)
+        }))
+    if not entries:
+        return 0
+    entries.sort(key=lambda e: e['timestamp'])
+    write_bytes_atomic(raw_file_path(channel_name), b''.join(encode_line(entry) for entry in entries))
+    rollover(channel_name, entries[-1]['timestamp'][:10])
+    return len(entries)
+
+def load_channel_stats(channel_name):
+    """全期間のレコードを古い順に返す（古い期間は1日1レコード、直近は実行ごと）"""
+    raw_entries = read_lines(raw_file_path(channel_name))
+    daily_entries = read_lines(daily_file_path(channel_name))
+    if raw_entries:
+        first_raw_date = raw_entries[0]['timestamp'][:10]
+        daily_entries = [entry for entry in daily_entries if entry['timestamp'][:10] < first_raw_date]
+    return daily_entries + raw_entries
+
+def load_channel_series(channel_name):
+    """チャンネル統計の推移を読み込む（ストアがなければ実行ログから作成）"""
+    entries = load_channel_stats(channel_name)
+    if entries:
+        return entries
+    return [dict(log['channel_stats'], timestamp=log['timestamp'])
+            for log in load_json(f'check_log_{channel_name}.json', [])
+            if 'channel_stats' in log and 'timestamp' in log]
+
+def find_previous_day_entry(entries):
+    """最新レコードより前の日付の最終レコードを取得"""
+    latest_date = entries[-1]['timestamp'][:10]
+    for entry in reversed(entries):
+        if entry['timestamp'][:10] < latest_date:
+            return entry
+    return None
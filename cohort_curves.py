@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+コホート別の成長曲線（タイプ × 公開月ごとの「公開からの日数」別の分布）
+
+日次集約（aggregate_daily_data）のたびに、新しく確定した日の値だけを追加する。
+公開からの日数ごとに件数・合計と、対数バケットのヒストグラム（スケッチ）を持つので、
+ダッシュボードは全動画を走査せずに中央値や分位点の帯を描ける。
+
+- 各動画は「最後に記録された日より前の日」だけを確定とみなす（当日は途中の値のため）
+- 公開から MAX_AGE_DAYS 日までを対象にする
+- 動画ごとに追加済みの最終日数を記録し、同じ日を二重に数えない
+- タイプが変わった動画は、旧コホートから値を差し引いて新コホートに移す
+
+保存形式（cohort_curves_{name}.json）:
+    {
+      "format": 1, "max_age": 365, "gamma": 1.1,
+      "videos": {"動画ID": ["type|YYYY-MM", 追加済みの最終日数], ...},
+      "cohorts": {
+        "type|YYYY-MM": {
+          "views": {"count": [日数ごとの件数], "sum": [...], "sketch": [{"バケット": 件数}, ...]},
+          "likes": {...}
+        }
+      }
+    }
+"""
+
+import math
+
+from storage import load_json, save_json
+from video_series import SECONDS_PER_DAY, parse_date
+
+FORMAT_VERSION = 1
+MAX_AGE_DAYS = 365  # 公開から何日目までを集計するか
+SKETCH_GAMMA = 1.1  # 対数バケットの幅（分位点の相対誤差は約5%）
+METRICS = ('views', 'likes')
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+def cohort_file_path(channel_name):
+    return f'cohort_curves_{channel_name}.json'
+
+def cohort_key(video_type, published):
+    """コホートのキー（'type|YYYY-MM'、公開日が不明ならNone）"""
+    if len(published) < 7:
+        return None
+    return f'{video_type}|{published[:7]}'
+
+def sketch_bucket(value):
+    """値の対数バケット（0以下は0）"""
+    if value <= 0:
+        return 0
+    return 1 + int(math.floor(math.log(value) / math.log(SKETCH_GAMMA)))
+
+def bucket_value(bucket):
+    """バケットの代表値（区間の中央）"""
+    if bucket <= 0:
+        return 0.0
+    low = SKETCH_GAMMA ** (bucket - 1)
+    return low * (1 + SKETCH_GAMMA) / 2
+
+def daily_samples(series, published, last_age=-1):
+    """確定した日の (公開からの日数, 再生数, 高評価数) を返す
+    
+    Args:
+        last_age: この日数以前は返さない（追加済み）
+    """
+    start_day = parse_date(published)
+    if start_day is None or len(series) < 2:
+        return []
+    last_day = series.timestamps[-1] // SECONDS_PER_DAY
+    samples = []
+    for i in range(len(series)):
+        day = series.timestamps[i] // SECONDS_PER_DAY
+        age = day - start_day
+        if day >= last_day or age > MAX_AGE_DAYS:
+            break
+        if age > last_age:
+            samples.append((age, series.views[i], series.likes[i]))
+    return samples
+
+class CohortCurves:
+    """コホート別の集計（インクリメンタル更新）"""
+    
+    def __init__(self, data=None):
+        data = data or {}
+        if data.get('format') != FORMAT_VERSION or data.get('gamma') != SKETCH_GAMMA \
+                or data.get('max_age') != MAX_AGE_DAYS:
+            data = {}
+        self.videos = data.get('videos', {})
+        self.cohorts = data.get('cohorts', {})
+    
+    @classmethod
+    def load(cls, file_path):
+        return cls(load_json(file_path, None))
+    
+    def save(self, file_path):
+        save_json(file_path, {
+            'format': FORMAT_VERSION,
+            'max_age': MAX_AGE_DAYS,
+            'gamma': SKETCH_GAMMA,
+            'videos': self.videos,
+            'cohorts': self.cohorts
+        })
+    
+    def _add(self, key, samples, sign=1):
+        cohort = self.cohorts.setdefault(key, {metric: {'count': [], 'sum': [], 'sketch': []} for metric in METRICS})
+        for age, views, likes in samples:
+            for metric, value in zip(METRICS, (views, likes)):
+                stats = cohort[metric]
+                while len(stats['count']) <= age:
+                    stats['count'].append(0)
+                    stats['sum'].append(0)
+                    stats['sketch'].append({})
+                stats['count'][age] += sign
+                stats['sum'][age] += sign * value
+                bucket = str(sketch_bucket(value))
+                count = stats['sketch'][age].get(bucket, 0) + sign
+                if count:
+                    stats['sketch'][age][bucket] = count
+                else:
+                    stats['sketch'][age].pop(bucket, None)
+        if sign < 0 and not any(cohort['views']['count']):
+            del self.cohorts[key]
+    
+    def observe(self, meta, series):
+        """1動画の日次系列から、未追加の確定日を追加する
+        
+        Returns:
+            追加した日数
+        """
+        key = cohort_key(meta.video_type, meta.published)
+        if key is None:
+            return 0
+        previous = self.videos.get(meta.video_id)
+        last_age = -1
+        if previous is not None:
+            previous_key, last_age = previous
+            if previous_key != key:
+                # タイプが変わった：追加済みの値を旧コホートから新コホートへ移す
+                moved = [s for s in daily_samples(series, meta.published) if s[0] <= last_age]
+                self._add(previous_key, moved, sign=-1)
+                self._add(key, moved)
+        
+        samples = daily_samples(series, meta.published, last_age)
+        if samples:
+            self._add(key, samples)
+            last_age = samples[-1][0]
+        if last_age >= 0:
+            self.videos[meta.video_id] = [key, last_age]
+        return len(samples)
+
+def sketch_quantiles(sketch, count, quantiles=QUANTILES):
+    """ヒストグラムから分位点を求める"""
+    buckets = sorted((int(bucket), n) for bucket, n in sketch.items())
+    result = []
+    index = 0
+    cumulative = 0
+    for q in quantiles:
+        target = q * (count - 1)
+        while index < len(buckets) and cumulative + buckets[index][1] <= target:
+            cumulative += buckets[index][1]
+            index += 1
+        result.append(bucket_value(buckets[min(index, len(buckets) - 1)][0]))
+    return result
+
+def cohort_summary(data, min_count=1):
+    """保存データから表示用の曲線（日数ごとの分位点）を作成
+    
+    Returns:
+        {コホートキー: {指標: {'ages': [...], 'count': [...], 'mean': [...],
+                              'p10' / 'p25' / 'p50' / 'p75' / 'p90': [...]}}}
+    """
+    curves = CohortCurves(data)
+    summary = {}
+    for key, cohort in curves.cohorts.items():
+        summary[key] = {}
+        for metric in METRICS:
+            stats = cohort[metric]
+            curve = {'ages': [], 'count': [], 'mean': []}
+            curve.update({f'p{int(q * 100)}': [] for q in QUANTILES})
+            for age, count in enumerate(stats['count']):
+                if count < min_count:
+                    continue
+                curve['ages'].append(age)
+                curve['count'].append(count)
+                curve['mean'].append(stats['sum'][age] / count)
+                for q, value in zip(QUANTILES, sketch_quantiles(stats['sketch'][age], count)):
+                    curve[f'p{int(q * 100)}'].append(value)
+            summary[key][metric] = curve
+    return summary
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+動画別履歴（video_daily_history_*.json）の読み書き
+
+値が前回から変わっていないレコードは保存せず、変化があったときだけ記録する。
+実行時刻の一覧（runs）と各動画の最終確認時刻（last_seen）を持つので、
+読み込み時には従来と同じ「実行ごとに1レコード」の系列を復元できる。
+
+保存形式:
+    {
+      "_meta": {"format": 2, "runs": [実行時刻, ...], "delta": false},
+      "動画ID": {
+        "タイトル": ..., "公開日": ..., "type": ...,
+        "last_seen": 最後に取得できた実行時刻,
+        "records": [値が変化したときのレコードのみ]
+      },
+      ...
+    }
+
+delta が true の場合、2件目以降のレコードの値は直前のレコードとの差分で保存する
+（環境変数 DAILY_HISTORY_DELTA=true で有効）。
+_meta を持たない従来形式（全実行のレコードを保存）も読み込める。
+
+iter_daily_history / iter_raw_daily_history / DailyHistoryWriter は動画1本ずつ読み書きするストリーミングAPIで、
+ファイル全体をメモリに載せずに処理できる（_meta は常に先頭に書き出す）。
+
+メモリ上では各動画の records を MetricSeries（列ごとの整数配列）で持ち、
+保存時にレコードのリストに戻す。
+"""
+
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+from storage import JsonObjectWriter, iter_json_items, read_json
+from video_series import MetricSeries, VideoMeta, iter_video_series, make_record, parse_timestamp
+
+META_KEY = '_meta'
+FORMAT_VERSION = 2
+DELTA_ENABLED = os.environ.get('DAILY_HISTORY_DELTA', 'false').lower() == 'true'
+
+def new_history():
+    """空の履歴を作成"""
+    return {META_KEY: {'format': FORMAT_VERSION, 'runs': [], 'delta': DELTA_ENABLED}}
+
+def from_dense(data):
+    """従来形式（全実行のレコードを保存）を変化時のみの形式に変換"""
+    history = new_history()
+    runs = set()
+    
+    for video_id, video_info in data.items():
+        records = sorted(video_info.get('records', []), key=lambda r: r.get('timestamp', ''))
+        series = MetricSeries.from_records(records)
+        sparse = MetricSeries()
+        last_counters = None
+        for i in range(len(series)):
+            runs.add(series.timestamp(i))
+            counters = series.counters(i)
+            if counters != last_counters:
+                sparse.append_seconds(series.timestamps[i], counters)
+                last_counters = counters
+        
+        entry = {key: value for key, value in video_info.items() if key != 'records'}
+        entry['records'] = sparse
+        if len(sparse):
+            entry['last_seen'] = series.timestamp(-1)
+        history[video_id] = entry
+    
+    history[META_KEY]['runs'] = sorted(runs)
+    return history
+
+def decode_series(video_info, delta):
+    """保存形式のレコードを MetricSeries（絶対値）にする"""
+    series = MetricSeries.from_records(video_info.get('records', []))
+    return series.accumulate() if delta else series
+
+def encode_video(video_info, delta):
+    """1動画分を保存形式に変換（delta=Trueなら2件目以降を差分にする）"""
+    series = video_info.get('records')
+    if not isinstance(series, MetricSeries):
+        return video_info
+    if not delta:
+        return dict(video_info, records=series.to_records())
+    records = []
+    previous = None
+    for i in range(len(series)):
+        counters = series.counters(i)
+        if previous is None:
+            records.append(make_record(series.timestamp(i), counters))
+        else:
+            diffs = tuple(value - prev for value, prev in zip(counters, previous))
+            records.append(make_record(series.timestamp(i), diffs))
+        previous = counters
+    return dict(video_info, records=records)
+
+def decode(data):
+    """保存形式からメモリ上の形式（値は絶対値、レコードは変化時のみ）に変換"""
+    if META_KEY not in data:
+        return from_dense(data)
+    
+    meta = data[META_KEY]
+    delta = meta.get('delta', False)
+    for video_id, video_info in iter_videos(data):
+        video_info['records'] = decode_series(video_info, delta)
+    meta['delta'] = DELTA_ENABLED
+    return data
+
+def encode(history, delta=None):
+    """メモリ上の形式から保存形式に変換（delta=Trueなら差分で保存）"""
+    if delta is None:
+        delta = DELTA_ENABLED
+    encoded = {META_KEY: dict(history[META_KEY], format=FORMAT_VERSION, delta=delta)}
+    for video_id, video_info in iter_videos(history):
+        encoded[video_id] = encode_video(video_info, delta)
+    return encoded
+
+class DailyHistoryWriter:
+    """動画別履歴を1動画ずつ書き出す
+    
+    with DailyHistoryWriter(path, runs) as writer:
+        writer.write(video_id, video_info)
+    """
+    
+    def __init__(self, file_path, runs, delta=None, codec=None):
+        self.runs = runs
+        self.delta = DELTA_ENABLED if delta is None else delta
+        self._writer = JsonObjectWriter(file_path, codec)
+    
+    def __enter__(self):
+        self._writer.__enter__()
+        self._writer.write_item(META_KEY, {'format': FORMAT_VERSION, 'runs': self.runs, 'delta': self.delta})
+        return self
+    
+    def write(self, video_id, video_info):
+        """1動画分（値は絶対値、レコードは変化時のみ）を書き出す"""
+        self._writer.write_item(video_id, encode_video(video_info, self.delta))
+    
+    def __exit__(self, exc_type, exc, tb):
+        return self._writer.__exit__(exc_type, exc, tb)
+
+def load_daily_history(file_path):
+    """動画別履歴を読み込む（メモリ上の形式、存在しない・読み込めない場合は空）"""
+    if os.path.exists(file_path):
+        try:
+            return decode(read_json(file_path))
+        except Exception:
+            return new_history()
+    return new_history()
+
+def save_daily_history(file_path, history):
+    """動画別履歴を保存（1動画ずつ書き出すので保存形式の全体コピーは作らない）"""
+    with DailyHistoryWriter(file_path, history[META_KEY]['runs']) as writer:
+        for video_id, video_info in iter_videos(history):
+            writer.write(video_id, video_info)
+
+def add_run(history, timestamp):
+    """実行時刻を登録"""
+    runs = history[META_KEY]['runs']
+    if not runs or runs[-1] != timestamp:
+        runs.append(timestamp)
+
+def append_observation(video_info, timestamp, counters):
+    """動画の今回の値を記録（前回と同じ値ならレコードは追加せず last_seen のみ更新）
+    
+    Returns:
+        レコードを追加した場合True
+    """
+    series = video_info.get('records')
+    if not isinstance(series, MetricSeries):
+        series = video_info['records'] = MetricSeries.from_records(series or [])
+    video_info['last_seen'] = timestamp
+    if series.last_counters() == tuple(counters):
+        return False
+    series.append(timestamp, counters)
+    return True
+
+def iter_videos(history):
+    """(動画ID, 動画情報) を順に返す（_meta を除く）"""
+    for video_id, video_info in history.items():
+        if video_id != META_KEY:
+            yield video_id, video_info
+
+def parse_runs(runs):
+    """実行時刻のリストを経過秒数の配列にする"""
+    return array('q', (parse_timestamp(timestamp) for timestamp in runs))
+
+def expand_series(run_seconds, series, last_seen=None):
+    """変化時のみの系列から、実行ごとに1レコードの系列を復元
+    
+    最初のレコードから last_seen までの各実行時刻について、その時点で
+    最新の値を持つ系列を返す。
+    
+    Args:
+        run_seconds: parse_runs() で変換した実行時刻
+        series: 変化時のみの MetricSeries
+        last_seen: 最終確認時刻（'YYYY-MM-DD HH:MM:SS'、省略時は最後のレコード）
+    """
+    dense = MetricSeries()
+    if not len(series):
+        return dense
+    timestamps = series.timestamps
+    last_seconds = parse_timestamp(last_seen) if last_seen else timestamps[-1]
+    start = bisect_left(run_seconds, timestamps[0])
+    end = bisect_right(run_seconds, last_seconds)
+    
+    index = 0
+    for seconds in run_seconds[start:end]:
+        while index + 1 < len(timestamps) and timestamps[index + 1] <= seconds:
+            index += 1
+        dense.append_seconds(seconds, series.counters(index))
+    return dense
+
+def iter_raw_daily_history(file_path):
+    """動画別履歴を1動画ずつ、レコードをデコードせずに読み込む（ファイル全体はメモリに載せない）
+    
+    レコードの解析・実行ごとの系列への復元は decode_video_item で行う
+    （プロセスプールのワーカーに渡して並列に処理できるようにするため）。
+    
+    Returns:
+        (layout, (動画ID, 保存形式の動画情報) のイテレータ)
+        layout は decode_video_item に渡す（従来形式・空のファイルではNone）
+    """
+    items = iter_json_items(file_path)
+    first = next(items, None)
+    if first is None:
+        return None, iter(())
+    if first[0] == META_KEY:
+        return (parse_runs(first[1].get('runs', [])), first[1].get('delta', False)), items
+    return None, chain([first], items)
+
+def decode_video_item(layout, video_id, video_info, on_invalid=None):
+    """iter_raw_daily_history の1動画分を (VideoMeta, 実行ごとの MetricSeries) にする"""
+    if layout is not None:
+        run_seconds, delta = layout
+        series = decode_series(video_info, delta)
+        return VideoMeta.from_dict(video_id, video_info), expand_series(run_seconds, series, video_info.get('last_seen'))
+    # 従来形式（全実行のレコードを保存）
+    records = sorted(video_info.get('records', []), key=lambda r: r.get('timestamp', ''))
+    return VideoMeta.from_dict(video_id, video_info), MetricSeries.from_records(records, on_invalid)
+
+def iter_daily_history(file_path, on_invalid=None):
+    """動画別履歴を1動画ずつ読み込む（ファイル全体はメモリに載せない）
+    
+    Args:
+        on_invalid: 不正なタイムスタンプを受け取る関数（警告表示用）
+    
+    Yields:
+        (VideoMeta, 実行ごとの MetricSeries)
+    """
+    layout, items = iter_raw_daily_history(file_path)
+    for video_id, video_info in items:
+        yield decode_video_item(layout, video_id, video_info, on_invalid)
+
+def load_video_series(channel_name):
+    """表示・出力用に動画ごとの系列を読み込む（日次集約データを優先、なければ動画別履歴）
+    
+    Returns:
+        {動画ID: (VideoMeta, MetricSeries)}（読み込めない場合は空）
+    """
+    # 集約データを優先的に読み込む
+    aggregated_file = f'video_daily_aggregated_{channel_name}.json'
+    if os.path.exists(aggregated_file):
+        try:
+            return {meta.video_id: (meta, series) for meta, series in iter_video_series(aggregated_file)}
+        except Exception:
+            pass
+    
+    # 集約データがない場合は生データを読み込む
+    history_file = f'video_daily_history_{channel_name}.json'
+    if os.path.exists(history_file):
+        try:
+            return {meta.video_id: (meta, series) for meta, series in iter_daily_history(history_file)}
+        except Exception:
+            return {}
+    return {}
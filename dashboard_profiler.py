@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ダッシュボードの再実行プロファイル（デバッグ用、通常は無効）
+
+URLのクエリパラメータ ?profile=... または環境変数 DASHBOARD_PROFILE で有効にすると、
+再実行ごとに各区間（データ取得・グラフ作成・動画カード描画など）の時間を計測し、
+サイドバーの折りたたみパネルに表示する。
+
+    1 / true     区間の時間のみ
+    cprofile     cProfile で関数ごとの時間（自身の時間の上位）も取得
+    tracemalloc  tracemalloc でこの実行中に確保されたメモリの上位も取得
+    all          すべて（カンマ区切りで複数指定も可）
+
+無効のときは区間の切り替えが何もしない関数呼び出しになるだけで、計測の負荷はない。
+"""
+
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+
+PROFILE_PARAM = 'profile'
+PROFILE_ENV = 'DASHBOARD_PROFILE'
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+DISABLED_VALUES = ('', '0', 'false', 'off')
+SESSION_KEY = '_rerun_profiler'
+HOT_SPOT_LIMIT = 20
+MEMORY_LIMIT = 10
+
+def profile_modes(query_params):
+    """有効なプロファイルのモード（無効ならNone、区間の時間のみなら空集合）"""
+    value = (query_params.get(PROFILE_PARAM) or os.environ.get(PROFILE_ENV, '')).strip().lower()
+    if value in DISABLED_VALUES:
+        return None
+    if value == 'all':
+        return set(PROFILE_MODES)
+    return {mode.strip() for mode in value.split(',') if mode.strip() in PROFILE_MODES}
+
+class StepTimer:
+    """処理ごとの時間を記録する（スナップショット作成時の読み込み・計算の内訳用）"""
+    
+    def __init__(self):
+        self.timings = {}
+    
+    def measure(self, name, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.timings[name] = time.perf_counter() - started
+        return result
+
+class RerunProfiler:
+    """1回の再実行の区間計測
+    
+    section(名前) を呼ぶと前の区間を閉じて新しい区間を始める（スクリプトの
+    インデントを変えずに区切りを入れられるようにするため）。
+    """
+    
+    def __init__(self, modes=None):
+        self.enabled = modes is not None
+        self.modes = modes or set()
+        self.sections = []
+        self.notes = []
+        self._current = None
+        self._started = None
+        self._profile = None
+        self._tracing = False
+        self._memory = None
+        self._total = None
+    
+    def start(self):
+        """計測を開始（前回の実行が st.stop / st.rerun で中断されていれば、その計測を止める）"""
+        previous = st.session_state.get(SESSION_KEY)
+        if previous is not None:
+            previous.finish()
+        if not self.enabled:
+            st.session_state.pop(SESSION_KEY, None)
+            return
+        st.session_state[SESSION_KEY] = self
+        
+        if 'cprofile' in self.modes:
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError:
+                # 別のセッションの計測中（プロファイラはプロセスで1つしか使えない場合がある）
+                self._profile = None
+                self.notes.append("cProfile は他のセッションで使用中のため取得できませんでした")
+        if 'tracemalloc' in self.modes:
+            if tracemalloc.is_tracing():
+                self.notes.append("tracemalloc は既に有効なため、この実行以前の確保分も含みます")
+            else:
+                tracemalloc.start()
+                self._tracing = True
+        self._started = time.perf_counter()
+    
+    def section(self, name):
+        """前の区間を閉じて、新しい区間を始める"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self.sections.append((self._current[0], now - self._current[1]))
+        self._current = (name, now)
+    
+    def finish(self):
+        """計測を終了（2回目以降は何もしない）"""
+        if not self.enabled or self._total is not None:
+            return
+        self.section(None)
+        self._total = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+        if 'tracemalloc' in self.modes and tracemalloc.is_tracing():
+            self._memory = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            ))
+            if self._tracing:
+                tracemalloc.stop()
+        if st.session_state.get(SESSION_KEY) is self:
+            del st.session_state[SESSION_KEY]
+    
+    def section_table(self):
+        return pd.DataFrame([{
+            '区間': name,
+            '時間(ms)': round(seconds * 1000, 1),
+            '割合': f"{seconds / self._total * 100:.0f}%" if self._total else '-'
+        } for name, seconds in self.sections])
+    
+    def hot_spots(self, limit=HOT_SPOT_LIMIT):
+        """関数ごとの時間（自身の時間の上位）"""
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (file_name, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({
+                '関数': f"{function} ({os.path.basename(file_name)}:{line})",
+                '呼び出し': calls,
+                '自身(ms)': round(own * 1000, 1),
+                '累積(ms)': round(cumulative * 1000, 1)
+            })
+        rows.sort(key=lambda row: row['自身(ms)'], reverse=True)
+        return pd.DataFrame(rows[:limit])
+    
+    def memory_top(self, limit=MEMORY_LIMIT):
+        """確保されたメモリの上位（行ごと）"""
+        return pd.DataFrame([{
+            '場所': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            'サイズ(KiB)': round(stat.size / 1024, 1),
+            '件数': stat.count
+        } for stat in self._memory.statistics('lineno')[:limit]])
+    
+    def render(self, store_stats=None, build_timings=None):
+        """計測を終了し、サイドバーに結果を表示"""
+        if not self.enabled:
+            return
+        self.finish()
+        with st.sidebar.expander(f"🛠️ プロファイル ({self._total * 1000:.0f}ms)"):
+            st.dataframe(self.section_table(), hide_index=True, use_container_width=True)
+            
+            if store_stats is not None:
+                st.caption(f"📦 データストア: ヒット {store_stats['hits']:,} / ミス {store_stats['misses']:,}"
+                           f"（保持中 {len(store_stats['talents'])}タレント）")
+            if build_timings:
+                st.caption("🏗️ スナップショット作成の内訳（データ更新時のみ実行）")
+                st.dataframe(pd.DataFrame([{'処理': name, '時間(ms)': round(seconds * 1000, 1)}
+                                           for name, seconds in build_timings.items()]),
+                             hide_index=True, use_container_width=True)
+            if self._profile is not None:
+                st.caption("🔥 cProfile（自身の時間の上位）")
+                st.dataframe(self.hot_spots(), hide_index=True, use_container_width=True)
+            if self._memory is not None:
+                st.caption("💾 tracemalloc（確保されたメモリの上位）")
+                st.dataframe(self.memory_top(), hide_index=True, use_container_width=True)
+            for note in self.notes:
+                st.caption(f"⚠️ {note}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ダッシュボードのプロセス共通データストア
+
+Streamlit はブラウザのセッションごとにスクリプトを実行するため、セッションごとに
+データを読み込むと、メモリ使用量が「閲覧者数 × タレント数 × 履歴サイズ」で増える。
+このストアはタレントごとに1つだけスナップショット（読み取り専用）を持ち、
+全セッションに同じオブジェクトをそのまま渡す（コピーしない）。
+
+データファイルが更新されてバージョンが変わると、新しいスナップショットを作成して
+丸ごと差し替える。差し替え前のスナップショットを使用中のセッションは、
+その実行が終わるまで古いスナップショットをそのまま使える。
+"""
+
+import threading
+from types import MappingProxyType
+
+def freeze(value):
+    """dict / list を読み取り専用（MappingProxyType / tuple）に変換"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class TalentSnapshot:
+    """1タレント・1バージョン分のデータ（作成後は変更しない）"""
+    
+    __slots__ = ('talent_name', 'version', 'data')
+    
+    def __init__(self, talent_name, version, data):
+        self.talent_name = talent_name
+        self.version = version
+        self.data = data
+    
+    def __getitem__(self, key):
+        return self.data[key]
+
+class TalentDataStore:
+    """タレントごとのスナップショットを保持する
+    
+    Args:
+        builder: builder(タレント名) → スナップショットに入れるデータ（dict）
+        version_of: version_of(タレント名) → データのバージョン（ファイルの更新時刻など）
+    """
+    
+    def __init__(self, builder, version_of):
+        self.builder = builder
+        self.version_of = version_of
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def _build_lock(self, talent_name):
+        with self._lock:
+            return self._build_locks.setdefault(talent_name, threading.Lock())
+    
+    def get(self, talent_name):
+        """最新バージョンのスナップショットを返す（バージョンが変わっていれば作り直す）"""
+        version = self.version_of(talent_name)
+        snapshot = self._snapshots.get(talent_name)
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+        
+        # 同じタレントを複数のセッションが同時に作成しないようにする
+        with self._build_lock(talent_name):
+            snapshot = self._snapshots.get(talent_name)
+            if snapshot is not None and snapshot.version == version:
+                self.hits += 1
+                return snapshot
+            
+            snapshot = TalentSnapshot(talent_name, version, self.builder(talent_name))
+            self.misses += 1
+            # 参照の置き換えだけで差し替える（読み込み中のセッションは古い方を使い続ける）
+            self._snapshots[talent_name] = snapshot
+            return snapshot
+    
+    def stats(self):
+        """キャッシュの状況（ヒット数・ミス数・保持中のタレント）"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'talents': {name: snapshot.version for name, snapshot in self._snapshots.items()}
+        }
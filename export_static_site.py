@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ダッシュボードの静的サイト出力スクリプト
+
+GitHub Actions の集約処理のあとに実行し、データ更新時点の内容を静的なHTMLと
+JSONに書き出す。並び替え・絞り込み・グラフ描画はブラウザ側（JavaScript / Plotly.js）
+で行うので、閲覧ごとのサーバー側の計算はない（GitHub Pages などでそのまま配信できる）。
+
+出力（デフォルトは docs/）:
+    index.html           タレント一覧
+    {name}.html          タレントごとのページ
+    data/{name}.json     動画リスト（最新値・前日比）、日次系列、チャンネル推移、
+                         キリ番予測・達成履歴
+
+対話的に使う場合は従来どおり youtube_dashboard.py（Streamlit）を使う。
+"""
+
+import argparse
+import glob
+import html
+import json
+import os
+from string import Template
+from urllib.parse import quote
+
+from storage import encode_json, load_json, write_bytes_atomic
+from daily_history import load_video_series
+from channel_stats_store import find_previous_day_entry, load_channel_series
+from video_analytics import build_video_entry
+from milestone_forecast import forecast_file_path, upcoming_milestones
+from milestone_events import load_milestone_events
+
+DEFAULT_OUTPUT_DIR = 'docs'
+UPCOMING_HORIZON_DAYS = 7
+RECENT_EVENTS = 200  # 出力するキリ番達成履歴の件数（新しい順）
+VIDEO_COLUMNS = ['id', 'title', 'type', 'published', 'views', 'viewsDelta', 'viewsRate',
+                 'likes', 'likesDelta', 'likesRate']
+
+def get_talents():
+    """出力対象のタレント（video_history_*.json があるもの）"""
+    return sorted(file.replace('video_history_', '').replace('.json', '')
+                  for file in glob.glob('video_history_*.json'))
+
+def channel_summary(talent_name, history, channel_series):
+    """チャンネル統計の最新値と前日比"""
+    channel_stats = history.get('channel_stats', {})
+    summary = {
+        'name': channel_stats.get('チャンネル名', talent_name),
+        'subscribers': channel_stats.get('登録者数', 0),
+        'views': channel_stats.get('総再生数', 0),
+        'videos': channel_stats.get('動画数', 0),
+        'updated': history.get('timestamp', '')
+    }
+    previous = find_previous_day_entry(channel_series) if channel_series else None
+    if previous:
+        current = channel_series[-1]
+        summary['subscribersDelta'] = current.get('登録者数', 0) - previous.get('登録者数', 0)
+        summary['viewsDelta'] = current.get('総再生数', 0) - previous.get('総再生数', 0)
+        summary['videosDelta'] = current.get('動画数', 0) - previous.get('動画数', 0)
+    return summary
+
+def build_talent_payload(talent_name):
+    """タレント1人分の出力データを作成（ブラウザ側で計算しないよう整形済み）"""
+    history = load_json(f'video_history_{talent_name}.json', None)
+    if not history:
+        return None
+    channel_series = load_channel_series(talent_name)
+    video_history = load_video_series(talent_name)
+    
+    videos = []
+    series = {}
+    for video_id, (meta, video_series) in video_history.items():
+        if not len(video_series):
+            continue
+        entry = build_video_entry(meta, video_series)
+        videos.append([
+            video_id, meta.title, meta.video_type, meta.published,
+            entry['再生数'], entry['再生数増加'], round(entry['再生数増加率'], 2),
+            entry['高評価数'], entry['高評価増加'], round(entry['高評価増加率'], 2)
+        ])
+        # 日付はエポックからの日数（ブラウザ側で Date に変換）
+        series[video_id] = {
+            'd': [seconds // 86400 for seconds in video_series.timestamps],
+            'v': video_series.views.tolist(),
+            'l': video_series.likes.tolist()
+        }
+    videos.sort(key=lambda row: row[4], reverse=True)
+    
+    events = load_milestone_events(talent_name)[-RECENT_EVENTS:]
+    events.reverse()
+    
+    return {
+        'talent': talent_name,
+        'channel': channel_summary(talent_name, history, channel_series),
+        'channelSeries': {
+            't': [entry['timestamp'] for entry in channel_series],
+            'subscribers': [entry.get('登録者数', 0) for entry in channel_series],
+            'views': [entry.get('総再生数', 0) for entry in channel_series]
+        },
+        'columns': VIDEO_COLUMNS,
+        'videos': videos,
+        'series': series,
+        'upcoming': upcoming_milestones(load_json(forecast_file_path(talent_name), None), UPCOMING_HORIZON_DAYS),
+        'events': events
+    }
+
+def write_text(file_path, text):
+    write_bytes_atomic(file_path, text.encode('utf-8'))
+
+def export_site(output_dir):
+    """静的サイトを書き出す
+    
+    Returns:
+        出力したタレントのリスト
+    """
+    os.makedirs(os.path.join(output_dir, 'data'), exist_ok=True)
+    # GitHub Pages で Jekyll の処理を行わない
+    write_text(os.path.join(output_dir, '.nojekyll'), '')
+    
+    exported = []
+    for talent in get_talents():
+        payload = build_talent_payload(talent)
+        if payload is None:
+            print(f"⚠️  {talent}: データが見つからないためスキップ")
+            continue
+        write_bytes_atomic(os.path.join(output_dir, 'data', f'{talent}.json'), encode_json(payload))
+        write_text(os.path.join(output_dir, f'{talent}.html'), TALENT_PAGE.substitute(
+            title=html.escape(payload['channel']['name']),
+            data_url=json.dumps(f'data/{quote(talent)}.json')
+        ))
+        exported.append(payload)
+        print(f"✅ {talent}: 動画 {len(payload['videos'])}本")
+    
+    links = '\n'.join(
+        f'<a class="talent" href="{quote(payload["talent"])}.html">'
+        f'<div class="name">{html.escape(payload["channel"]["name"])}</div>'
+        f'<div class="stat">登録者 {payload["channel"]["subscribers"]:,}人 / 総再生 {payload["channel"]["views"]:,}回</div>'
+        f'</a>'
+        for payload in exported
+    )
+    updated = max((payload['channel']['updated'] for payload in exported), default='')
+    write_text(os.path.join(output_dir, 'index.html'), INDEX_PAGE.substitute(links=links, updated=html.escape(updated)))
+    return [payload['talent'] for payload in exported]
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='ダッシュボードを静的サイトとして書き出す')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help='出力先ディレクトリ')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🌐 静的サイト出力")
+    print("=" * 60)
+    
+    talents = export_site(args.output)
+    if not talents:
+        print("⚠️  出力対象のタレントが見つかりません。")
+        return
+    print(f"🎉 {len(talents)}タレント分を出力しました: {args.output}/")
+
+COMMON_STYLE = """
+body { font-family: 'Noto Sans JP', sans-serif; margin: 0; background: #f7f8fa; color: #222; }
+header { padding: 16px 24px; background: #fff; border-bottom: 1px solid #e3e5e8; }
+main { padding: 16px 24px; max-width: 1200px; margin: 0 auto; }
+a { color: #1565c0; }
+.muted { color: #777; font-size: 13px; }
+"""
+
+INDEX_PAGE = Template("""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>YouTube Stats Dashboard</title>
+<style>""" + COMMON_STYLE + """
+.talents { display: grid; grid-template-columns: repeat(auto-fill, minmax(260px, 1fr)); gap: 16px; }
+.talent { display: block; padding: 16px; background: #fff; border: 1px solid #e3e5e8; border-radius: 8px; text-decoration: none; color: inherit; }
+.talent .name { font-size: 18px; font-weight: 700; margin-bottom: 6px; }
+.talent .stat { font-size: 13px; color: #555; }
+</style>
+</head>
+<body>
+<header><h1>📊 YouTube Stats Dashboard</h1><div class="muted">更新: $updated</div></header>
+<main><div class="talents">
+$links
+</div></main>
+</body>
+</html>
+""")
+
+TALENT_PAGE = Template("""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title - YouTube Stats Dashboard</title>
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<style>""" + COMMON_STYLE + """
+.metrics { display: flex; gap: 24px; flex-wrap: wrap; margin: 12px 0; }
+.metric .label { font-size: 13px; color: #666; }
+.metric .value { font-size: 24px; font-weight: 700; }
+.positive { color: #2e7d32; font-size: 13px; }
+.controls { display: flex; gap: 12px; flex-wrap: wrap; align-items: center; margin: 12px 0; }
+table { width: 100%; border-collapse: collapse; background: #fff; font-size: 14px; }
+th, td { padding: 6px 8px; border-bottom: 1px solid #eceef1; text-align: right; }
+th { cursor: pointer; background: #f0f2f5; position: sticky; top: 0; }
+td.title, th.title { text-align: left; }
+section { margin: 24px 0; }
+</style>
+</head>
+<body>
+<header><a href="index.html">← タレント一覧</a><h1 id="channel-name">$title</h1><div class="muted" id="updated"></div></header>
+<main>
+<div class="metrics" id="metrics"></div>
+<section><div id="channel-chart"></div></section>
+<section id="upcoming-section"><h2>⏳ 7日以内に達成予定のキリ番</h2><table id="upcoming"></table></section>
+<section id="chart-section" hidden>
+  <h2>📈 選択動画の推移</h2>
+  <div class="controls">
+    <label><input type="checkbox" id="show-views" checked> 📊 再生数</label>
+    <label><input type="checkbox" id="show-likes" checked> 👍 高評価数</label>
+    <label><input type="radio" name="x-axis" value="date" checked> 📅 日付</label>
+    <label><input type="radio" name="x-axis" value="age"> 🎂 公開からの日数</label>
+  </div>
+  <div id="video-chart"></div>
+</section>
+<section>
+  <h2>🎞️ 動画リスト</h2>
+  <div class="controls">
+    <select id="type-filter">
+      <option value="ALL">すべて</option><option value="Movie">📹 Movie</option>
+      <option value="Short">🎬 Short</option><option value="LiveArchive">🔴 LiveArchive</option>
+    </select>
+    <input type="search" id="search" placeholder="🔍 タイトル検索">
+    <span class="muted" id="count"></span>
+  </div>
+  <table>
+    <thead><tr>
+      <th></th><th class="title" data-sort="title">タイトル</th>
+      <th data-sort="views">再生数</th><th data-sort="viewsDelta">前日比</th><th data-sort="viewsRate">増加率</th>
+      <th data-sort="likes">高評価数</th><th data-sort="likesDelta">前日比</th><th data-sort="likesRate">増加率</th>
+    </tr></thead>
+    <tbody id="videos"></tbody>
+  </table>
+</section>
+<section><h2>🏆 キリ番達成の履歴</h2><table id="events"></table></section>
+</main>
+<script>
+const DATA_URL = $data_url;
+const TYPE_EMOJI = {Movie: '📹', Short: '🎬', LiveArchive: '🔴'};
+const DAY_MS = 86400000;
+let data, videos, sortKey = 'views', sortDesc = true;
+const selected = new Set();
+
+const fmt = n => Number(n).toLocaleString('ja-JP');
+const signed = n => (n > 0 ? '+' : '') + fmt(n);
+const esc = s => String(s).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+
+function renderMetrics() {
+  const c = data.channel;
+  const metric = (label, value, unit, delta) => `<div class="metric"><div class="label">$${label}</div>
+    <div class="value">$${fmt(value)}$${unit}</div>$${delta ? `<div class="positive">$${signed(delta)}</div>` : ''}</div>`;
+  document.getElementById('updated').textContent = '更新: ' + c.updated;
+  document.getElementById('metrics').innerHTML =
+    metric('登録者数', c.subscribers, '人', c.subscribersDelta) +
+    metric('総再生数', c.views, '回', c.viewsDelta) +
+    metric('動画数', c.videos, '本', c.videosDelta);
+  const s = data.channelSeries;
+  if (s.t.length >= 2) {
+    Plotly.newPlot('channel-chart', [
+      {x: s.t, y: s.subscribers, name: '登録者数', mode: 'lines'},
+      {x: s.t, y: s.views, name: '総再生数', mode: 'lines', yaxis: 'y2'}
+    ], {height: 300, margin: {l: 60, r: 60, t: 20, b: 40}, yaxis2: {overlaying: 'y', side: 'right'}}, {responsive: true});
+  }
+}
+
+function renderUpcoming() {
+  const rows = data.upcoming;
+  if (!rows.length) { document.getElementById('upcoming-section').hidden = true; return; }
+  document.getElementById('upcoming').innerHTML = '<tr><th>予定日</th><th class="title">タイトル</th><th>指標</th><th>キリ番</th><th>現在</th><th>日速</th></tr>' +
+    rows.map(r => `<tr><td>$${r['予定日'].slice(0, 16)}</td><td class="title">$${esc(r['タイトル'])}</td><td>$${r['指標']}</td>
+      <td>$${fmt(r['キリ番'])}</td><td>$${fmt(r['現在の値'])}</td><td>+$${fmt(r['日速'])}</td></tr>`).join('');
+}
+
+function renderEvents() {
+  const titles = Object.fromEntries(videos.map(v => [v.id, v.title]));
+  document.getElementById('events').innerHTML = '<tr><th>達成日時</th><th class="title">タイトル</th><th>指標</th><th>キリ番</th></tr>' +
+    data.events.map(e => `<tr><td>$${e.timestamp.slice(0, 16)}</td><td class="title">$${esc(titles[e['動画ID']] || e['動画ID'])}</td>
+      <td>$${e['タイプ']}</td><td>$${fmt(e['キリ番'])}</td></tr>`).join('');
+}
+
+function renderVideos() {
+  const type = document.getElementById('type-filter').value;
+  const terms = document.getElementById('search').value.normalize('NFKC').toLowerCase().split(/\\s+/).filter(Boolean);
+  let rows = videos.filter(v => (type === 'ALL' || v.type === type) && terms.every(t => v.key.includes(t)));
+  rows.sort((a, b) => (a[sortKey] < b[sortKey] ? -1 : a[sortKey] > b[sortKey] ? 1 : 0) * (sortDesc ? -1 : 1));
+  document.getElementById('count').textContent = `$${rows.length}本`;
+  document.getElementById('videos').innerHTML = rows.map(v => `<tr>
+    <td><input type="checkbox" data-id="$${v.id}" $${selected.has(v.id) ? 'checked' : ''}></td>
+    <td class="title">$${TYPE_EMOJI[v.type] || ''} <a href="https://www.youtube.com/watch?v=$${v.id}" target="_blank">$${esc(v.title)}</a></td>
+    <td>$${fmt(v.views)}</td><td>$${signed(v.viewsDelta)}</td><td>$${v.viewsRate.toFixed(1)}%</td>
+    <td>$${fmt(v.likes)}</td><td>$${signed(v.likesDelta)}</td><td>$${v.likesRate.toFixed(1)}%</td></tr>`).join('');
+}
+
+function renderChart() {
+  const section = document.getElementById('chart-section');
+  section.hidden = selected.size === 0;
+  if (section.hidden) return;
+  const showViews = document.getElementById('show-views').checked;
+  const showLikes = document.getElementById('show-likes').checked;
+  const byAge = document.querySelector('input[name="x-axis"]:checked').value === 'age';
+  const traces = [];
+  for (const id of selected) {
+    const v = videos.find(video => video.id === id);
+    const s = data.series[id];
+    if (!v || !s) continue;
+    const publishDay = Date.parse(v.published) / DAY_MS;
+    if (byAge && isNaN(publishDay)) continue;
+    const x = byAge ? s.d.map(d => d - publishDay) : s.d.map(d => new Date(d * DAY_MS).toISOString().slice(0, 10));
+    const name = v.title.length > 30 ? v.title.slice(0, 30) + '...' : v.title;
+    if (showViews) traces.push({x, y: s.v, name: `$${name} (再生数)`, mode: 'lines+markers'});
+    if (showLikes) traces.push({x, y: s.l, name: `$${name} (高評価)`, mode: 'lines+markers', line: {dash: 'dot'}});
+  }
+  Plotly.react('video-chart', traces, {height: 400, hovermode: 'x unified', margin: {l: 60, r: 20, t: 20, b: 50},
+    xaxis: {title: byAge ? '公開からの日数' : '日付'}}, {responsive: true});
+}
+
+fetch(DATA_URL).then(r => r.json()).then(json => {
+  data = json;
+  videos = data.videos.map(row => Object.fromEntries(data.columns.map((c, i) => [c, row[i]])));
+  videos.forEach(v => { v.key = v.title.normalize('NFKC').toLowerCase(); });
+  renderMetrics();
+  renderUpcoming();
+  renderEvents();
+  renderVideos();
+  document.getElementById('type-filter').addEventListener('change', renderVideos);
+  document.getElementById('search').addEventListener('input', renderVideos);
+  document.querySelectorAll('th[data-sort]').forEach(th => th.addEventListener('click', () => {
+    sortDesc = sortKey === th.dataset.sort ? !sortDesc : true;
+    sortKey = th.dataset.sort;
+    renderVideos();
+  }));
+  document.getElementById('videos').addEventListener('change', e => {
+    if (!e.target.dataset.id) return;
+    e.target.checked ? selected.add(e.target.dataset.id) : selected.delete(e.target.dataset.id);
+    renderChart();
+  });
+  document.querySelectorAll('#chart-section input').forEach(input => input.addEventListener('change', renderChart));
+});
+</script>
+</body>
+</html>
+""")
+
+if __name__ == '__main__':
+    main()
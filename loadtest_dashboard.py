@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ダッシュボードの負荷テスト（同時セッションのシミュレーション）
+
+配信直後に複数人が同時にダッシュボードを開いた状況を再現する。
+合成データを一時ディレクトリに生成してダッシュボードをローカルの Streamlit サーバーで起動し、
+ブラウザの代わりにN個のWebSocketクライアントから同時に操作して、
+操作ごとの再実行時間（操作を送ってからスクリプトの実行が終わるまで）のパーセンタイルと
+サーバープロセスのメモリ使用量を表示する。
+
+- サーバーは実運用と同じ1プロセスなので、キャッシュ・データストアは全セッションで共有される
+  （AppTest はランタイムがプロセス内で1つしかなく、同時に動かせないため使わない）
+- 画面の要素（ウィジェットのIDと値）は AppTest と同じ要素ツリーの解析で取り出す
+
+各セッションの操作:
+    初回表示 → タレント切り替え → 動画のチェックを付け外し → 並び替えの変更 を繰り返す
+
+使い方:
+    python loadtest_dashboard.py --sessions 8 --iterations 5 --videos 300 --days 180
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+from tornado.websocket import websocket_connect
+
+from storage import save_json
+from daily_history import add_run, append_observation, new_history, save_daily_history
+from video_series import TIMESTAMP_FORMAT, MetricSeries
+from channel_stats_store import append_channel_stats, make_entry
+from aggregate_daily_data import aggregate_daily_data
+from cohort_curves import cohort_file_path
+from milestone_forecast import forecast_file_path
+from milestone_events import rebuild_milestone_events
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'youtube_dashboard.py')
+VIDEO_TYPES = ('Movie', 'Short', 'LiveArchive')
+TYPE_COUNT_KEYS = {'Movie': 'movie_count', 'Short': 'short_count', 'LiveArchive': 'archive_count'}  # auto_check と同じキー
+SORT_LABEL = "🔽 並び替え"
+PERCENTILES = (50, 90, 95, 99)
+SERVER_START_TIMEOUT = 60  # サーバー起動待ちの上限（秒）
+
+def generate_talent(talent_name, video_count, days, runs_per_day, rng):
+    """合成データを1タレント分生成（auto_check・日次集約と同じ関数で保存する）"""
+    start = datetime(2025, 1, 1)
+    run_times = [start + timedelta(days=day, hours=24 * run / runs_per_day)
+                 for day in range(days) for run in range(runs_per_day)]
+    
+    # 動画ごとの公開日と伸び方（公開直後に伸びて徐々に落ち着く）
+    publish_days = np.sort(rng.integers(-365, days, video_count))
+    scales = rng.lognormal(8, 1.5, video_count)
+    types = rng.choice(VIDEO_TYPES, video_count, p=[0.5, 0.3, 0.2])
+    
+    history = new_history()
+    channel_file = f'channel_stats_{talent_name}.jsonl'
+    if os.path.exists(channel_file):
+        os.remove(channel_file)
+    
+    channel_stats = None
+    for run_time in run_times:
+        timestamp = run_time.strftime(TIMESTAMP_FORMAT)
+        add_run(history, timestamp)
+        age = (run_time - start).total_seconds() / 86400 - publish_days
+        published = age >= 0
+        views = np.where(published, scales * np.log1p(np.maximum(age, 0)), 0).astype(np.int64)
+        likes = views // 40
+        for i in np.flatnonzero(published):
+            video_id = f'{talent_name}_{i:05d}'
+            if video_id not in history:
+                history[video_id] = {
+                    'タイトル': f'{talent_name} 合成動画 {i} 【{types[i]}】',
+                    '公開日': (start + timedelta(days=int(publish_days[i]))).strftime('%Y-%m-%d'),  # publishedAt[:10] と同じ形式
+                    'type': str(types[i]),
+                    'records': MetricSeries()
+                }
+            append_observation(history[video_id], timestamp, (int(views[i]), int(likes[i]), int(likes[i] // 10)))
+        
+        channel_stats = {
+            'チャンネル名': talent_name,
+            '登録者数': 1000 + int(views.sum() // 200),
+            '総再生数': int(views.sum()),
+            '動画数': int(published.sum()),
+            '取得日時': timestamp
+        }
+        type_counts = {TYPE_COUNT_KEYS[video_type]: int(np.sum(published & (types == video_type)))
+                       for video_type in VIDEO_TYPES}
+        append_channel_stats(talent_name, make_entry(timestamp, channel_stats, type_counts))
+    
+    save_daily_history(f'video_daily_history_{talent_name}.json', history)
+    save_json(f'video_history_{talent_name}.json', {
+        'timestamp': run_times[-1].strftime(TIMESTAMP_FORMAT),
+        'channel_stats': channel_stats,
+        'videos': {video_id: {'再生数': info['records'].views[-1], '高評価数': info['records'].likes[-1], 'type': info['type']}
+                   for video_id, info in history.items() if video_id != '_meta'}
+    })
+    rebuild_milestone_events(talent_name, [(video_id, info['records'])
+                                           for video_id, info in history.items() if video_id != '_meta'])
+    aggregate_daily_data(f'video_daily_history_{talent_name}.json', f'video_daily_aggregated_{talent_name}.json',
+                         cohort_file=cohort_file_path(talent_name), forecast_file=forecast_file_path(talent_name))
+
+def generate_dataset(talent_count, video_count, days, runs_per_day, seed):
+    rng = np.random.default_rng(seed)
+    talents = [f'T{i}' for i in range(talent_count)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for talent in talents:
+            generate_talent(talent, video_count, days, runs_per_day, rng)
+    return talents
+
+def find_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(work_dir, port):
+    """合成データのディレクトリでダッシュボードを起動し、応答するまで待つ"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', SCRIPT_PATH,
+         '--server.headless=true', f'--server.port={port}', '--server.address=127.0.0.1',
+         '--server.fileWatcherType=none', '--browser.gatherUsageStats=false'],
+        cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('Streamlit サーバーが起動できませんでした')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('Streamlit サーバーの起動がタイムアウトしました')
+
+def process_memory_mib(pid):
+    """プロセスの現在とピークの常駐メモリ（MiB、/proc がない環境では None）"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return None, None
+    return (int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024)
+
+class Session:
+    """1人分の閲覧操作（ブラウザの代わりにWebSocketでサーバーと通信する）"""
+    
+    def __init__(self, index, url, timings, timeout):
+        self.rng = random.Random(index)
+        self.url = url
+        self.timings = timings
+        self.timeout = timeout
+        self.connection = None
+        self.tree = None
+        self.widget_values = {}  # 操作したウィジェットの値（ウィジェットID → WidgetState）
+        self.errors = []
+    
+    async def rerun(self, action, state=None):
+        """操作を送り、スクリプトの実行が終わるまでの時間を記録
+        
+        ブラウザと同じく、これまでに操作したウィジェットの値をまとめて送る
+        （ボタンのクリックは送った回だけ有効）。
+        """
+        client_state = ClientState(query_string='')
+        if state is not None:
+            self.widget_values[state.id] = state
+            client_state.widget_states.widgets.extend(self.widget_values.values())
+            if state.WhichOneof('value') == 'trigger_value':
+                del self.widget_values[state.id]
+        started = time.perf_counter()
+        await self.connection.write_message(BackMsg(rerun_script=client_state).SerializeToString(), binary=True)
+        
+        # st.rerun() で途中終了した回は読み飛ばし、最後の実行の出力だけを残す
+        messages = []
+        while True:
+            raw = await asyncio.wait_for(self.connection.read_message(), self.timeout)
+            if raw is None:
+                raise ConnectionError('サーバーとの接続が切れました')
+            message = ForwardMsg()
+            message.ParseFromString(raw)
+            kind = message.WhichOneof('type')
+            if kind == 'new_session':
+                messages = []
+            messages.append(message)
+            if kind == 'script_finished' and message.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.timings.setdefault(action, []).append(time.perf_counter() - started)
+        
+        self.tree = parse_tree_from_messages(messages)
+        if self.tree.exception:
+            self.errors.append(f'{action}: {self.tree.exception[0].value}')
+    
+    async def switch_talent(self, talent_count):
+        index = self.rng.randrange(talent_count)
+        buttons = [b for b in self.tree.button if b.key == f'talent_btn_{index}']
+        if buttons:
+            await self.rerun('タレント切り替え', WidgetState(id=buttons[0].id, trigger_value=True))
+    
+    async def toggle_videos(self, count=2):
+        checkboxes = [c for c in self.tree.checkbox if c.key and c.key.startswith('video_check_')]
+        for key in self.rng.sample([c.key for c in checkboxes], min(count, len(checkboxes))):
+            # 再実行ごとに要素ツリーが作り直されるので、キーで探し直す
+            checkbox = next((c for c in self.tree.checkbox if c.key == key), None)
+            if checkbox is not None:
+                # サーバー側のセッション状態は見えないので、送った値（なければ初期値）から反転する
+                sent = self.widget_values.get(checkbox.id)
+                checked = sent.bool_value if sent is not None else checkbox.proto.default
+                await self.rerun('動画チェック', WidgetState(id=checkbox.id, bool_value=not checked))
+    
+    async def change_sort(self):
+        selects = [s for s in self.tree.selectbox if s.label == SORT_LABEL]
+        if selects:
+            await self.rerun('並び替え', WidgetState(id=selects[0].id, string_value=self.rng.choice(selects[0].options)))
+    
+    async def simulate(self, iterations, talent_count):
+        self.connection = await websocket_connect(self.url, subprotocols=['streamlit'])
+        try:
+            await self.rerun('初回表示')
+            for _ in range(iterations):
+                if self.errors:
+                    break
+                await self.switch_talent(talent_count)
+                await self.toggle_videos()
+                await self.change_sort()
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            self.errors.append(f'{type(e).__name__}: {e}')
+        finally:
+            self.connection.close()
+        return self.errors
+
+async def run_sessions(url, session_count, iterations, talent_count, timeout):
+    timings = {}
+    sessions = [Session(i, url, timings, timeout) for i in range(session_count)]
+    results = await asyncio.gather(*(session.simulate(iterations, talent_count) for session in sessions))
+    return timings, [error for errors in results for error in errors]
+
+def print_report(timings, elapsed, sessions, memory):
+    # 操作名は全角文字で幅が揃わないので行末に置く
+    print(f"{'count':>6}" + ''.join(f"{f'p{p}':>9}" for p in PERCENTILES) + f"{'max':>9}  操作")
+    total = 0
+    for action, values in timings.items():
+        values = np.asarray(values) * 1000
+        total += len(values)
+        print(f"{len(values):>6}" + ''.join(f"{np.percentile(values, p):>7.0f}ms" for p in PERCENTILES)
+              + f"{values.max():>7.0f}ms  {action}")
+    print()
+    print(f"⏱️  経過時間: {elapsed:.1f}秒 / {sessions}セッション / 再実行 {total}回（{total / elapsed:.1f}回/秒）")
+    current, peak = memory
+    if current is None:
+        print("💾 サーバーのメモリ: 取得できません（/proc がない環境）")
+    else:
+        print(f"💾 サーバーのメモリ: 現在 {current:.0f} MiB / ピーク {peak:.0f} MiB")
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='ダッシュボードの同時セッション負荷テスト')
+    parser.add_argument('--sessions', type=int, default=8, help='同時セッション数')
+    parser.add_argument('--iterations', type=int, default=5, help='セッションごとの操作の繰り返し回数')
+    parser.add_argument('--talents', type=int, default=3, help='合成データのタレント数')
+    parser.add_argument('--videos', type=int, default=200, help='タレントごとの動画数')
+    parser.add_argument('--days', type=int, default=90, help='履歴の日数')
+    parser.add_argument('--runs-per-day', type=int, default=4, help='1日あたりの取得回数')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--timeout', type=float, default=120, help='1回の再実行のタイムアウト（秒）')
+    parser.add_argument('--keep', action='store_true', help='合成データのディレクトリを削除しない')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🏋️ ダッシュボード負荷テスト")
+    print("=" * 60)
+    
+    work_dir = tempfile.mkdtemp(prefix='dashboard_loadtest_')
+    original_dir = os.getcwd()
+    server = None
+    try:
+        os.chdir(work_dir)
+        started = time.perf_counter()
+        talents = generate_dataset(args.talents, args.videos, args.days, args.runs_per_day, args.seed)
+        os.chdir(original_dir)
+        print(f"📦 合成データ: {len(talents)}タレント × {args.videos}本 × {args.days}日"
+              f"（{args.runs_per_day}回/日、{time.perf_counter() - started:.1f}秒）: {work_dir}")
+        
+        port = find_free_port()
+        server = start_server(work_dir, port)
+        print(f"🚀 サーバー起動: http://127.0.0.1:{port}（メモリ {process_memory_mib(server.pid)[0] or 0:.0f} MiB）")
+        print(f"👥 {args.sessions}セッション × {args.iterations}回の操作を実行中...")
+        print()
+        
+        started = time.perf_counter()
+        timings, errors = asyncio.run(run_sessions(f'ws://127.0.0.1:{port}/_stcore/stream', args.sessions,
+                                                   args.iterations, len(talents), args.timeout))
+        elapsed = time.perf_counter() - started
+        
+        print_report(timings, elapsed, args.sessions, process_memory_mib(server.pid))
+        if errors:
+            print()
+            print(f"❌ エラー {len(errors)}件:")
+            for error in errors[:10]:
+                print(f"   {error}")
+            sys.exit(1)
+    finally:
+        os.chdir(original_dir)
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if args.keep:
+            print(f"📁 合成データを残しました: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+キリ番達成の履歴（milestone_events_{name}.jsonl）
+
+実行ログ（check_log_*.json）の achievements は直近100回分しか残らないため、
+キリ番達成を (時刻, 動画ID, 指標, キリ番) の1行1レコードで別に保存する。
+
+- ストアがないときは動画別履歴（video_daily_history_*.json）から作り直す
+  （各動画の系列の累積最大値に対して searchsorted で、キリ番ごとに最初に到達した
+   レコードを求める。記録開始時点ですでに超えていたキリ番は含めない）
+- 以降は実行ごとに、その回の達成分を追記する
+"""
+
+import os
+
+import numpy as np
+
+from milestones import milestones_for
+from storage import encode_line, read_lines, write_bytes_atomic
+from video_series import format_timestamp
+
+METRIC_COLUMNS = {'再生数': 'views', '高評価数': 'likes'}
+
+def events_file_path(channel_name):
+    return f'milestone_events_{channel_name}.jsonl'
+
+def has_milestone_events(channel_name):
+    return os.path.exists(events_file_path(channel_name))
+
+def make_event(timestamp, video_id, metric, milestone):
+    return {'timestamp': timestamp, '動画ID': video_id, 'タイプ': metric, 'キリ番': milestone}
+
+def crossing_events(timestamps, values, milestones):
+    """系列の中で新たに到達したキリ番と、最初に到達したレコードの時刻を求める
+    
+    Args:
+        timestamps / values: 1動画の系列（NumPy配列、時刻順）
+        milestones: キリ番の配列（昇順）
+    
+    Returns:
+        (キリ番の配列, 到達時刻（経過秒数）の配列)
+    """
+    # 一時的に値が下がっても、到達済みのキリ番は到達済みとして扱う
+    peak = np.maximum.accumulate(values)
+    reached = milestones[(milestones > values[0]) & (milestones <= peak[-1])]
+    return reached, timestamps[np.searchsorted(peak, reached, side='left')]
+
+def build_milestone_events(videos):
+    """全動画のキリ番達成を系列から求める
+    
+    Args:
+        videos: [(動画ID, MetricSeries), ...]
+    
+    Returns:
+        時刻順のイベントのリスト
+    """
+    milestone_arrays = {metric: np.asarray(milestones_for(metric), dtype=np.int64) for metric in METRIC_COLUMNS}
+    events = []
+    for video_id, series in videos:
+        if len(series) < 2:
+            continue
+        timestamps, views, likes, _ = series.to_numpy()
+        for metric, values in (('再生数', views), ('高評価数', likes)):
+            reached, reached_at = crossing_events(timestamps, values, milestone_arrays[metric])
+            for milestone, seconds in zip(reached.tolist(), reached_at.tolist()):
+                events.append(make_event(format_timestamp(seconds), video_id, metric, milestone))
+    events.sort(key=lambda e: (e['timestamp'], e['動画ID'], e['タイプ'], e['キリ番']))
+    return events
+
+def rebuild_milestone_events(channel_name, videos):
+    """動画別履歴からストアを作り直す
+    
+    Returns:
+        保存したイベント数
+    """
+    events = build_milestone_events(videos)
+    write_bytes_atomic(events_file_path(channel_name), b''.join(encode_line(event) for event in events))
+    return len(events)
+
+def append_milestone_events(channel_name, timestamp, achievements):
+    """今回の実行で達成したキリ番を追記"""
+    if not achievements:
+        return
+    with open(events_file_path(channel_name), 'ab') as f:
+        for achievement in achievements:
+            f.write(encode_line(make_event(timestamp, achievement['動画ID'], achievement['タイプ'], achievement['キリ番'])))
+
+def load_milestone_events(channel_name):
+    """全イベントを時刻順に返す"""
+    return read_lines(events_file_path(channel_name))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+キリ番の達成予測（全動画をNumPyで一括計算）
+
+日次集約（aggregate_daily_data）のたびに、各動画の直近 FORECAST_WINDOW 日分の
+日次レコードから伸び（1日あたり）を求め、次の再生数・高評価数のキリ番に
+到達する予定日を計算して milestone_forecast_{name}.json に保存する。
+
+- 伸びは隣り合うレコード間の増加速度の中央値（一時的な急増・欠測の影響を受けにくい）
+- 次のキリ番は searchsorted で全動画まとめて求める
+- 予定日が FORECAST_MAX_DAYS 日以内のものだけを、予定日の早い順に保存する
+- 最新の実行で取得できなかった動画（削除・非公開など）は除く
+
+保存形式:
+    {
+      "generated_at": 計算に使った最新レコードの時刻,
+      "window": 7,
+      "columns": ["動画ID", "タイトル", "type", "指標", "現在の値", "キリ番", "日速", "予定日", "残り日数"],
+      "rows": [[...], ...]
+    }
+"""
+
+import warnings
+
+import numpy as np
+
+from milestones import milestones_for
+from storage import save_json
+from video_series import SECONDS_PER_DAY, format_timestamp
+
+FORECAST_WINDOW = 7  # 伸びの計算に使う日次レコードの日数
+FORECAST_MAX_DAYS = 90  # 保存する予定日の上限（日）
+METRICS = ('再生数', '高評価数')
+COLUMNS = ['動画ID', 'タイトル', 'type', '指標', '現在の値', 'キリ番', '日速', '予定日', '残り日数']
+
+def forecast_file_path(channel_name):
+    return f'milestone_forecast_{channel_name}.json'
+
+def robust_velocity(timestamps, values):
+    """1日あたりの伸びを全動画まとめて計算
+    
+    Args:
+        timestamps / values: 動画数 × (FORECAST_WINDOW + 1) の行列（足りない分は NaN）
+    
+    Returns:
+        動画ごとの伸び（隣り合うレコード間の速度の中央値、計算できなければ NaN）
+    """
+    elapsed_days = np.diff(timestamps, axis=1) / SECONDS_PER_DAY
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(elapsed_days > 0, np.diff(values, axis=1) / elapsed_days, np.nan)
+    with warnings.catch_warnings():
+        # レコードが1件しかない動画は全て NaN になる
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmedian(rates, axis=1)
+
+def next_milestones(current, milestones):
+    """現在値を超える最初のキリ番（キリ番リストの上限を超えていれば NaN）"""
+    milestones = np.asarray(milestones, dtype=np.float64)
+    index = np.searchsorted(milestones, current, side='right')
+    reachable = index < len(milestones)
+    return np.where(reachable, milestones[np.minimum(index, len(milestones) - 1)], np.nan)
+
+class ForecastCollector:
+    """集約中の動画から直近の日次レコードを集め、最後に一括で予測する"""
+    
+    def __init__(self, window=FORECAST_WINDOW):
+        self.width = window + 1
+        self.metas = []
+        self.columns = {'timestamps': [], '再生数': [], '高評価数': []}
+    
+    def add(self, meta, daily):
+        """1動画分の日次系列（MetricSeries）を追加"""
+        if not len(daily):
+            return
+        self.metas.append(meta)
+        self.columns['timestamps'].append(daily.timestamps[-self.width:])
+        self.columns['再生数'].append(daily.views[-self.width:])
+        self.columns['高評価数'].append(daily.likes[-self.width:])
+    
+    def _matrix(self, name):
+        """右詰めの行列（足りない分は左側を NaN）"""
+        matrix = np.full((len(self.metas), self.width), np.nan)
+        for row, column in enumerate(self.columns[name]):
+            matrix[row, self.width - len(column):] = column
+        return matrix
+    
+    def forecast(self, max_days=FORECAST_MAX_DAYS):
+        """全動画の次のキリ番と予定日を計算（予定日の早い順）"""
+        if not self.metas:
+            return []
+        timestamps = self._matrix('timestamps')
+        latest = timestamps[:, -1]
+        
+        rows = []
+        for metric in METRICS:
+            values = self._matrix(metric)
+            current = values[:, -1]
+            velocity = robust_velocity(timestamps, values)
+            target = next_milestones(current, milestones_for(metric))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                eta_days = np.where(velocity > 0, (target - current) / velocity, np.inf)
+            eta_days[np.isnan(eta_days)] = np.inf
+            
+            # 最新レコードが全体の最新より1日以上古い動画は予測しない
+            eta_days[latest < np.nanmax(latest) - SECONDS_PER_DAY] = np.inf
+            
+            for i in np.flatnonzero(eta_days <= max_days):
+                meta = self.metas[i]
+                rows.append([
+                    meta.video_id, meta.title, meta.video_type, metric,
+                    int(current[i]), int(target[i]), round(float(velocity[i]), 1),
+                    format_timestamp(int(latest[i] + eta_days[i] * SECONDS_PER_DAY)),
+                    round(float(eta_days[i]), 2)
+                ])
+        rows.sort(key=lambda row: row[-1])
+        return rows
+    
+    def save(self, file_path):
+        """予測を保存
+        
+        Returns:
+            保存した予測の件数
+        """
+        rows = self.forecast()
+        generated_at = max((ts[-1] for ts in self.columns['timestamps']), default=None)
+        save_json(file_path, {
+            'generated_at': format_timestamp(generated_at) if generated_at is not None else None,
+            'window': self.width - 1,
+            'columns': COLUMNS,
+            'rows': rows
+        })
+        return len(rows)
+
+def upcoming_milestones(data, horizon_days=7):
+    """保存済みの予測から、horizon_days 日以内に達成予定のものを取り出す（予定日順）
+    
+    Returns:
+        [{列名: 値}, ...]
+    """
+    if not data or not data.get('rows'):
+        return []
+    columns = data['columns']
+    days_index = columns.index('残り日数')
+    upcoming = []
+    for row in data['rows']:
+        if row[days_index] > horizon_days:
+            break
+        upcoming.append(dict(zip(columns, row)))
+    return upcoming
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+キリ番の定義（auto_check / aggregate_daily_data / youtube_dashboard 共通）
+"""
+
+def generate_view_milestones(max_value=100000000):
+    """再生数のキリ番を生成"""
+    milestones = [500]  # 最初のキリ番
+    
+    # 1,000～9,000（1,000刻み）
+    for i in range(1000, 10000, 1000):
+        milestones.append(i)
+    
+    # 10,000以降（5,000刻み）
+    current = 10000
+    while current <= max_value:
+        milestones.append(current)
+        current += 5000
+    
+    return milestones
+
+def generate_like_milestones(max_value=1000000):
+    """高評価数のキリ番を生成"""
+    milestones = []
+    
+    # 100刻み
+    current = 100
+    while current <= max_value:
+        milestones.append(current)
+        current += 100
+    
+    return milestones
+
+def milestones_for(metric):
+    """指標名（'再生数' / '高評価数'）のキリ番リスト"""
+    if metric == '再生数':
+        return generate_view_milestones()
+    return generate_like_milestones()
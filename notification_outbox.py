@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+キリ番達成・再生数の急上昇の通知の送信待ちキュー（notification_outbox.json）
+
+チャンネルの処理中は通知をキューに積むだけにし、実行の最後にまとめて送信する
+（メールサーバーが遅い・落ちていてもデータの取得・保存は待たない）。
+送信できなかった通知はファイルに残し、次回の実行で再送する。
+
+- 同じ (動画ID, 指標, キリ番) の通知は1回だけ送る（送信待ち・送信済みの両方で重複を除く）
+  急上昇は (動画ID, '急上昇', 検出日) で1日1回まで
+- 送信済みのキーは直近 SENT_KEEP 件だけ保持する
+- MAX_ATTEMPTS 回失敗した通知は破棄する
+
+保存形式:
+    {
+      "pending": [{"channel": ..., "動画ID": ..., "タイプ": ..., "キリ番": ..., "タイトル": ...,
+                   "現在の値": ..., "type": ..., "enqueued_at": ..., "attempts": 0, "last_error": null}, ...],
+      "sent": [["動画ID", "タイプ", キリ番], ...]
+    }
+"""
+
+import threading
+
+from storage import load_json, save_json
+
+OUTBOX_FILE = 'notification_outbox.json'
+SENT_KEEP = 2000  # 重複除外のために保持する送信済みキーの件数
+MAX_ATTEMPTS = 10  # これ以上失敗した通知は破棄する
+NOTIFICATION_FIELDS = ('timestamp', '動画ID', 'タイプ', 'キリ番', 'タイトル', '現在の値', 'type',
+                       '日速', '平常時の日速', 'スコア', '検出日')
+
+def notification_key(item):
+    """重複除外のキー (動画ID, 指標, キリ番)（急上昇はキリ番の代わりに検出日）"""
+    return (item['動画ID'], item['タイプ'], item['キリ番'] if 'キリ番' in item else item['検出日'])
+
+class NotificationOutbox:
+    """通知の送信待ちキュー（複数スレッドから積める）"""
+    
+    def __init__(self, file_path=OUTBOX_FILE):
+        self.file_path = file_path
+        data = load_json(file_path, None) or {}
+        self.pending = data.get('pending', [])
+        self.sent = [tuple(key) for key in data.get('sent', [])]
+        self._sent_keys = set(self.sent)
+        self._pending_keys = {notification_key(item) for item in self.pending}
+        self._lock = threading.Lock()
+    
+    def enqueue(self, channel_name, notifications, timestamp):
+        """キリ番達成・急上昇を送信待ちに追加
+        
+        Returns:
+            追加した件数（送信待ち・送信済みと重複するものは除く）
+        """
+        added = 0
+        with self._lock:
+            for notification in notifications:
+                key = notification_key(notification)
+                if key in self._pending_keys or key in self._sent_keys:
+                    continue
+                item = {field: notification[field] for field in NOTIFICATION_FIELDS if field in notification}
+                item.update({'channel': channel_name, 'enqueued_at': timestamp, 'attempts': 0, 'last_error': None})
+                self.pending.append(item)
+                self._pending_keys.add(key)
+                added += 1
+        return added
+    
+    def pending_by_channel(self):
+        """送信待ちをチャンネルごとにまとめる（チャンネルの初出順）"""
+        with self._lock:
+            grouped = {}
+            for item in self.pending:
+                grouped.setdefault(item['channel'], []).append(item)
+            return grouped
+    
+    def mark_sent(self, items):
+        with self._lock:
+            keys = {notification_key(item) for item in items}
+            self.pending = [item for item in self.pending if notification_key(item) not in keys]
+            self._pending_keys -= keys
+            self.sent.extend(keys - self._sent_keys)
+            self.sent = self.sent[-SENT_KEEP:]
+            self._sent_keys = set(self.sent)
+    
+    def mark_failed(self, items, error):
+        """送信失敗を記録
+        
+        Returns:
+            MAX_ATTEMPTS に達して破棄した件数
+        """
+        with self._lock:
+            for item in items:
+                item['attempts'] += 1
+                item['last_error'] = str(error)
+            dropped = [item for item in self.pending if item['attempts'] >= MAX_ATTEMPTS]
+            if dropped:
+                self.pending = [item for item in self.pending if item['attempts'] < MAX_ATTEMPTS]
+                self._pending_keys = {notification_key(item) for item in self.pending}
+            return len(dropped)
+    
+    def save(self):
+        with self._lock:
+            save_json(self.file_path, {
+                'pending': self.pending,
+                'sent': [list(key) for key in self.sent]
+            })
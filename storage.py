@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+データファイルの読み書き（auto_check / aggregate_daily_data / youtube_dashboard 共通）
+
+- 書き込み形式は環境変数 STORAGE_CODEC で切り替える
+    json   : コンパクトなJSON（デフォルト）
+    gzip   : gzip圧縮したコンパクトなJSON
+    pretty : インデント付きJSON（従来形式）
+- 読み込み時は形式を自動判別する（gzipはマジックバイトで判定）
+- orjson がインストールされていればエンコード/デコードに使用する
+- 書き込みは一時ファイル + rename によるアトミック更新
+- トップレベルのオブジェクトを1件ずつ読み書きするストリーミングAPI
+  （iter_json_items / JsonObjectWriter、メモリ使用量は最大の1件分）
+- 追記のみのログ・履歴用の JSON Lines（1行1レコード）の読み書き
+  （encode_line / append_line / read_lines / read_last_line）
+"""
+
+import codecs
+import gzip
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+DEFAULT_CODEC = os.environ.get('STORAGE_CODEC', 'json')
+
+def encode_json(data, indent=False):
+    """JSONをUTF-8のバイト列にエンコード（orjsonがあれば使用）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def decode_json(raw):
+    """バイト列をデコード（gzip圧縮は自動判別）"""
+    if raw.startswith(GZIP_MAGIC):
+        raw = gzip.decompress(raw)
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+# 書き込み形式（名前 → データをバイト列にする関数）
+CODECS = {
+    'json': lambda data: encode_json(data),
+    'pretty': lambda data: encode_json(data, indent=True),
+    # mtime=0 で同じ内容なら同じバイト列になるようにする（不要なgit差分を防ぐ）
+    'gzip': lambda data: gzip.compress(encode_json(data), mtime=0),
+}
+
+def read_json(file_path):
+    """データファイルを読み込む（形式は自動判別、エラーはそのまま送出）"""
+    with open(file_path, 'rb') as f:
+        return decode_json(f.read())
+
+def load_json(file_path, default=None):
+    """データファイルを読み込む（存在しない・読み込めない場合はdefaultを返す）"""
+    if os.path.exists(file_path):
+        try:
+            return read_json(file_path)
+        except Exception:
+            return default
+    return default
+
+def write_bytes_atomic(file_path, payload):
+    """一時ファイルに書き込んでから置き換える（書き込み途中のファイルを残さない）"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix=os.path.basename(file_path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def save_json(file_path, data, codec=None):
+    """データファイルに保存（codec省略時は STORAGE_CODEC の形式）"""
+    encoder = CODECS[codec or DEFAULT_CODEC]
+    write_bytes_atomic(file_path, encoder(data))
+
+def encode_line(entry):
+    """JSON Linesの1行（改行付き）にエンコード"""
+    return encode_json(entry) + b'\n'
+
+def read_lines(file_path):
+    """JSON Linesファイルを読み込む（書き込み途中の壊れた行は無視）"""
+    entries = []
+    if not os.path.exists(file_path):
+        return entries
+    with open(file_path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(decode_json(line))
+            except ValueError:
+                continue
+    return entries
+
+def read_last_line(file_path):
+    """ファイル末尾の1レコードだけを読み込む（ファイル全体は読まない）"""
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        buffer = b''
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            buffer = f.read(step) + buffer
+            lines = buffer.rstrip(b'\n').split(b'\n')
+            if len(lines) > 1 or position == 0:
+                try:
+                    return decode_json(lines[-1])
+                except ValueError:
+                    return None
+    return None
+
+def append_line(file_path, entry):
+    """JSON Linesファイルに1行追記"""
+    with open(file_path, 'ab') as f:
+        f.write(encode_line(entry))
+
+def open_binary(file_path):
+    """読み込み用に開く（gzip圧縮なら展開しながら読む）"""
+    with open(file_path, 'rb') as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(file_path, 'rb')
+    return open(file_path, 'rb')
+
+def iter_json_items(file_path, chunk_size=1 << 16):
+    """トップレベルのJSONオブジェクトの (キー, 値) を先頭から1件ずつ返す
+    
+    ファイル全体を読み込まず、値1件分ずつデコードする。
+    """
+    decoder = json.JSONDecoder()
+    whitespace = ' \t\r\n'
+    delimiters = whitespace + ',:}]'
+    
+    with open_binary(file_path) as f:
+        text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        buffer = ''
+        pos = 0
+        eof = False
+        
+        def fill(size):
+            nonlocal buffer, pos, eof
+            data = f.read(size)
+            if not data:
+                eof = True
+            buffer = buffer[pos:] + text_decoder.decode(data, final=eof)
+            pos = 0
+        
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in whitespace:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill(chunk_size)
+        
+        def decode_next():
+            nonlocal pos
+            size = chunk_size
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # 数値は途中で切れていても成功する（"12.5" の "12." → 12）ので、
+                    # 直後が区切り文字まで読み込めている場合だけ採用する
+                    if eof or (end < len(buffer) and buffer[end] in delimiters):
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill(size)
+                size *= 2
+        
+        def expect(char):
+            nonlocal pos
+            skip_whitespace()
+            if pos >= len(buffer) or buffer[pos] != char:
+                raise ValueError(f"JSONの形式が不正です: '{char}' が必要です ({file_path})")
+            pos += 1
+        
+        expect('{')
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == '}':
+            return
+        
+        while True:
+            skip_whitespace()
+            key = decode_next()
+            expect(':')
+            skip_whitespace()
+            value = decode_next()
+            yield key, value
+            
+            skip_whitespace()
+            if pos < len(buffer) and buffer[pos] == ',':
+                pos += 1
+                continue
+            expect('}')
+            return
+
+class JsonObjectWriter:
+    """トップレベルのJSONオブジェクトを1件ずつ書き出す（アトミック）
+    
+    with JsonObjectWriter(path) as writer:
+        writer.write_item(key, value)
+    
+    codec は json / pretty / gzip に対応（それ以外は全件をまとめて save_json で保存）。
+    """
+    
+    STREAM_CODECS = ('json', 'pretty', 'gzip')
+    
+    def __init__(self, file_path, codec=None):
+        self.file_path = file_path
+        self.codec = codec or DEFAULT_CODEC
+        self._items = None
+        self._count = 0
+    
+    def __enter__(self):
+        if self.codec not in self.STREAM_CODECS:
+            self._items = {}
+            return self
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, self._temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_',
+                                               suffix=os.path.basename(self.file_path))
+        self._raw = os.fdopen(fd, 'wb')
+        if self.codec == 'gzip':
+            self._out = gzip.GzipFile(fileobj=self._raw, mode='wb', mtime=0)
+        else:
+            self._out = self._raw
+        self._out.write(b'{')
+        return self
+    
+    def write_item(self, key, value):
+        """1件書き出す"""
+        if self._items is not None:
+            self._items[key] = value
+            return
+        if self.codec == 'pretty':
+            prefix = b',\n  ' if self._count else b'\n  '
+            payload = encode_json(key) + b': ' + encode_json(value, indent=True).replace(b'\n', b'\n  ')
+        else:
+            prefix = b',' if self._count else b''
+            payload = encode_json(key) + b':' + encode_json(value)
+        self._out.write(prefix + payload)
+        self._count += 1
+    
+    def write_encoded(self, key, encoded):
+        """encode_json でエンコード済みの値を1件書き出す（別プロセスでエンコードした値用）"""
+        if self._items is not None or self.codec == 'pretty':
+            self.write_item(key, decode_json(encoded))
+            return
+        self._out.write((b',' if self._count else b'') + encode_json(key) + b':' + encoded)
+        self._count += 1
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._items is not None:
+            if exc_type is None:
+                save_json(self.file_path, self._items, self.codec)
+            return False
+        try:
+            if exc_type is None:
+                self._out.write(b'\n}' if self.codec == 'pretty' and self._count else b'}')
+            if self._out is not self._raw:
+                self._out.close()
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            self._raw.close()
+            if exc_type is None:
+                os.chmod(self._temp_path, 0o644)
+                os.replace(self._temp_path, self.file_path)
+        finally:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+        return False
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+storage.iter_json_items のテスト（python -m pytest test_storage.py）
+
+読み込みの区切り（chunk_size）が値の途中に来ても、全体を json.load した場合と
+同じ結果になることを確認する。
+"""
+
+import json
+
+import pytest
+
+from storage import iter_json_items
+
+SAMPLES = [
+    {"a": 12.5, "b": 3},
+    {"x": 1e5, "y": -2.25E-3, "z": [1.5, 2e10, {"w": 0.125}]},
+    {"小数": 123456.789, "指数": 6.02e23, "負": -0.5, "整数": 1234567890},
+    {"records": [{"timestamp": "2026-01-01 00:00:00", "再生数": 1e3, "高評価数": 10.75}] * 5},
+    {"last": 42},
+    {},
+]
+
+@pytest.mark.parametrize('data', SAMPLES)
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_iter_json_items_matches_json_load(tmp_path, data, chunk_size, indent):
+    file_path = tmp_path / 'data.json'
+    file_path.write_text(json.dumps(data, ensure_ascii=False, indent=indent), encoding='utf-8')
+    
+    assert dict(iter_json_items(str(file_path), chunk_size=chunk_size)) == data
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+動画タイトルの部分一致検索（文字n-gramの転置インデックス）
+
+形態素解析を使わず、タイトルの1文字・2文字の組ごとに動画IDの集合を持つ。
+検索語の2文字組の集合を積集合で絞り込み、候補だけを部分一致で確認するので、
+日本語でもタイトル全件を走査せずに検索できる。
+"""
+
+import unicodedata
+
+def normalize_text(text):
+    """検索用に正規化（全角英数・半角カナの統一、大文字小文字を区別しない）"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class TitleSearchIndex:
+    """タイトルの転置インデックス"""
+    
+    def __init__(self, titles):
+        """
+        Args:
+            titles: {動画ID: タイトル}
+        """
+        self.titles = {video_id: normalize_text(title) for video_id, title in titles.items()}
+        self.postings = {}
+        for video_id, title in self.titles.items():
+            for gram in ngrams(title, 1) | ngrams(title, 2):
+                self.postings.setdefault(gram, set()).add(video_id)
+    
+    def _search_term(self, term):
+        if len(term) == 1:
+            return set(self.postings.get(term, ()))
+        
+        # 出現動画の少ない2文字組から順に積集合をとる
+        posting_lists = sorted((self.postings.get(gram, set()) for gram in ngrams(term, 2)), key=len)
+        candidates = set(posting_lists[0])
+        for posting in posting_lists[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+        
+        # 2文字組がすべて含まれても連続しているとは限らないので部分一致で確認
+        return {video_id for video_id in candidates if term in self.titles[video_id]}
+    
+    def search(self, query):
+        """検索語（空白区切りでAND検索）に一致する動画IDの集合を返す（検索語が空ならNone）"""
+        terms = normalize_text(query).split()
+        if not terms:
+            return None
+        
+        result = None
+        for term in sorted(terms, key=len, reverse=True):
+            matched = self._search_term(term)
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result
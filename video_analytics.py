@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+動画の時系列の集計（NumPyによる一括計算、ダッシュボード・静的サイト出力用）
+
+ダッシュボードではスナップショット作成時（データ更新ごとに1回）に計算し、
+セッション間で共有する。
+"""
+
+import numpy as np
+
+from video_series import SECONDS_PER_DAY, parse_date
+
+VIDEO_TYPES = ('Movie', 'Short', 'LiveArchive')
+
+def build_video_entry(meta, series):
+    """動画リストの1行（最新値と前日比）を作成"""
+    current_views = series.views[-1]
+    current_likes = series.likes[-1]
+    
+    # 前日比を計算
+    views_change = 0
+    views_change_rate = 0.0
+    likes_change = 0
+    likes_change_rate = 0.0
+    
+    if len(series) >= 2:
+        previous_views = series.views[-2]
+        previous_likes = series.likes[-2]
+        
+        views_change = current_views - previous_views
+        if previous_views > 0:
+            views_change_rate = (views_change / previous_views) * 100
+        
+        likes_change = current_likes - previous_likes
+        if previous_likes > 0:
+            likes_change_rate = (likes_change / previous_likes) * 100
+    
+    return {
+        'id': meta.video_id,
+        'タイトル': meta.title,
+        'type': meta.video_type,
+        '再生数': current_views,
+        '再生数増加': views_change,
+        '再生数増加率': views_change_rate,
+        '高評価数': current_likes,
+        '高評価増加': likes_change,
+        '高評価増加率': likes_change_rate
+    }
+
+def build_growth_matrix(video_history):
+    """全動画 × 日の再生数増加の行列を作成
+    
+    動画ごとの累計再生数を日単位の密な行列に並べ、記録のない日は直前の値で埋めてから
+    日方向の差分を1回で計算する（公開前・初回記録日は NaN、記録のない日の増加は
+    次に記録された日に計上される）。
+    
+    Args:
+        video_history: {動画ID: (VideoMeta, MetricSeries)}
+    
+    Returns:
+        {'dates': 日付の配列（datetime64[D]、2日目から）,
+         'video_ids' / 'titles' / 'types': 行ごとの動画情報,
+         'gains': 再生数増加の行列（動画数 × 日数）}
+        （レコードが2日分に満たない場合は None）
+    """
+    entries = [(meta, series) for meta, series in video_history.values() if len(series)]
+    if not entries:
+        return None
+    
+    days = [np.frombuffer(series.timestamps, dtype=np.int64) // SECONDS_PER_DAY for _, series in entries]
+    first_day = min(int(d[0]) for d in days)
+    last_day = max(int(d[-1]) for d in days)
+    day_count = last_day - first_day + 1
+    if day_count < 2:
+        return None
+    
+    # 累計再生数を密な行列に配置（同じ日に複数あれば後のレコードが残る）
+    rows = np.repeat(np.arange(len(entries)), [len(d) for d in days])
+    cols = np.concatenate(days) - first_day
+    totals = np.full((len(entries), day_count), np.nan)
+    totals[rows, cols] = np.concatenate([np.frombuffer(series.views, dtype=np.int64) for _, series in entries])
+    
+    # 記録のない日を直前の記録で埋める
+    last_observed = np.where(np.isnan(totals), 0, np.arange(day_count))
+    np.maximum.accumulate(last_observed, axis=1, out=last_observed)
+    filled = totals[np.arange(len(entries))[:, None], last_observed]
+    
+    return {
+        'dates': np.arange(first_day + 1, last_day + 1).astype('datetime64[D]'),
+        'video_ids': [meta.video_id for meta, _ in entries],
+        'titles': [meta.title for meta, _ in entries],
+        'types': np.array([meta.video_type for meta, _ in entries]),
+        'gains': np.diff(filled, axis=1)
+    }
+
+def type_totals(growth, days=None):
+    """タイプ別の日ごとの再生数増加合計
+    
+    Args:
+        days: 対象にする日の範囲（slice、省略時は全期間）
+    
+    Returns:
+        {タイプ: 日ごとの合計の配列}
+    """
+    gains = growth['gains'] if days is None else growth['gains'][:, days]
+    return {video_type: np.nansum(gains[growth['types'] == video_type], axis=0) for video_type in VIDEO_TYPES}
+
+def build_chart_arrays(video_history):
+    """動画ごとのグラフ用配列を作成
+    
+    Returns:
+        {動画ID: {'dates': 日付（datetime64[D]）,
+                  'ages': 公開からの日数（公開日が不明ならNone）,
+                  'views' / 'likes': 値（MetricSeries とメモリを共有）}}
+    """
+    arrays = {}
+    for video_id, (meta, series) in video_history.items():
+        if not len(series):
+            continue
+        timestamps, views, likes, _ = series.to_numpy()
+        days = timestamps // SECONDS_PER_DAY
+        publish_day = parse_date(meta.published)
+        arrays[video_id] = {
+            'dates': days.astype('datetime64[D]'),
+            'ages': days - publish_day if publish_day is not None else None,
+            'views': views,
+            'likes': likes
+        }
+    return arrays
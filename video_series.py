@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+動画データの型（auto_check / aggregate_daily_data / youtube_dashboard 共通）
+
+- VideoMeta    : 動画のメタデータ（タイトル・公開日・type）
+- MetricSeries : 再生数・高評価数・コメント数の時系列（列ごとの array('q')）
+
+レコード1件を dict で持つと1件あたり数百バイトかかるため、時系列は列ごとの
+整数配列（1件32バイト）で持つ。タイムスタンプは 'YYYY-MM-DD HH:MM:SS' を
+UTCとみなした経過秒数で保持し、JSONとの読み書きで元の文字列に戻す。
+to_numpy() で NumPy 配列（コピーなし）としても扱える。
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from storage import iter_json_items
+
+COUNTER_KEYS = ('再生数', '高評価数', 'コメント数')
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+SECONDS_PER_DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+
+def normalize_counters(record):
+    """レコードから再生数・高評価数・コメント数を取り出す（旧キー「いいね数」にも対応）"""
+    return (
+        record.get('再生数', 0),
+        record.get('高評価数', record.get('いいね数', 0)),
+        record.get('コメント数', 0)
+    )
+
+def make_record(timestamp, counters):
+    """タイムスタンプと値からレコードを作成"""
+    record = {'timestamp': timestamp}
+    record.update(zip(COUNTER_KEYS, counters))
+    return record
+
+# 実行時刻は全動画で共通なので、変換結果をキャッシュする
+@lru_cache(maxsize=1 << 16)
+def parse_timestamp(timestamp):
+    """'YYYY-MM-DD HH:MM:SS' を経過秒数に変換（形式が違えば ValueError）"""
+    return (datetime.strptime(timestamp, TIMESTAMP_FORMAT) - EPOCH) // ONE_SECOND
+
+@lru_cache(maxsize=1 << 16)
+def format_timestamp(seconds):
+    """経過秒数を 'YYYY-MM-DD HH:MM:SS' に戻す"""
+    return (EPOCH + timedelta(seconds=seconds)).strftime(TIMESTAMP_FORMAT)
+
+def parse_date(date):
+    """'YYYY-MM-DD'（公開日など）をエポックからの日数に変換（不正ならNone）"""
+    try:
+        return (datetime.strptime(date[:10], '%Y-%m-%d') - EPOCH).days
+    except (TypeError, ValueError):
+        return None
+
+class VideoMeta:
+    """動画のメタデータ"""
+    
+    __slots__ = ('video_id', 'title', 'published', 'video_type')
+    
+    def __init__(self, video_id, title='', published='', video_type='Movie'):
+        self.video_id = video_id
+        self.title = title
+        self.published = published
+        self.video_type = video_type
+    
+    @classmethod
+    def from_dict(cls, video_id, video_info):
+        """JSONの動画情報（タイトル・公開日・type）から作成"""
+        return cls(video_id,
+                   video_info.get('タイトル', ''),
+                   video_info.get('公開日', ''),
+                   video_info.get('type', 'Movie'))
+    
+    def to_dict(self):
+        """JSONの動画情報（records を除く）に変換"""
+        return {'タイトル': self.title, '公開日': self.published, 'type': self.video_type}
+
+class MetricSeries:
+    """再生数・高評価数・コメント数の時系列（タイムスタンプ順）"""
+    
+    __slots__ = ('timestamps', 'views', 'likes', 'comments')
+    
+    def __init__(self):
+        self.timestamps = array('q')
+        self.views = array('q')
+        self.likes = array('q')
+        self.comments = array('q')
+    
+    @classmethod
+    def from_records(cls, records, on_invalid=None):
+        """レコードのリストから作成（タイムスタンプが不正なレコードは除く）
+        
+        Args:
+            on_invalid: 不正なタイムスタンプを受け取る関数（警告表示用）
+        """
+        series = cls()
+        for record in records:
+            timestamp = record.get('timestamp', '')
+            try:
+                seconds = parse_timestamp(timestamp)
+            except (TypeError, ValueError):
+                if on_invalid is not None:
+                    on_invalid(timestamp)
+                continue
+            series.append_seconds(seconds, normalize_counters(record))
+        return series
+    
+    def to_records(self):
+        """レコードのリスト（JSONの形式）に変換"""
+        return [make_record(format_timestamp(seconds), counters)
+                for seconds, counters in zip(self.timestamps, zip(self.views, self.likes, self.comments))]
+    
+    def __len__(self):
+        return len(self.timestamps)
+    
+    def append_seconds(self, seconds, counters):
+        views, likes, comments = counters
+        self.timestamps.append(seconds)
+        self.views.append(views)
+        self.likes.append(likes)
+        self.comments.append(comments)
+    
+    def append(self, timestamp, counters):
+        """1件追加（timestamp は 'YYYY-MM-DD HH:MM:SS'）"""
+        self.append_seconds(parse_timestamp(timestamp), counters)
+    
+    def timestamp(self, index):
+        return format_timestamp(self.timestamps[index])
+    
+    def counters(self, index):
+        """(再生数, 高評価数, コメント数)"""
+        return (self.views[index], self.likes[index], self.comments[index])
+    
+    def last_counters(self):
+        return self.counters(-1) if self.timestamps else None
+    
+    def accumulate(self):
+        """差分で保存された値を絶対値に戻す（自身を更新）"""
+        for column in (self.views, self.likes, self.comments):
+            for i in range(1, len(column)):
+                column[i] += column[i - 1]
+        return self
+    
+    def daily_last(self):
+        """1日1レコードに集約（各日の最も遅い時刻のレコードを採用、日付順）"""
+        latest = {}
+        for i, seconds in enumerate(self.timestamps):
+            day = seconds // SECONDS_PER_DAY
+            if day not in latest or seconds > self.timestamps[latest[day]]:
+                latest[day] = i
+        daily = MetricSeries()
+        for day in sorted(latest):
+            i = latest[day]
+            daily.append_seconds(self.timestamps[i], self.counters(i))
+        return daily
+    
+    def to_numpy(self):
+        """(timestamps, views, likes, comments) の int64 配列（配列のメモリを共有）"""
+        import numpy as np
+        return tuple(np.frombuffer(column, dtype=np.int64) if len(column) else np.zeros(0, dtype=np.int64)
+                     for column in (self.timestamps, self.views, self.likes, self.comments))
+
+def iter_video_series(file_path, on_invalid=None):
+    """実行ごと・日ごとのレコードを持つ形式（video_daily_aggregated_*.json など）を1動画ずつ読み込む
+    
+    Yields:
+        (VideoMeta, MetricSeries)
+    """
+    for video_id, video_info in iter_json_items(file_path):
+        yield (VideoMeta.from_dict(video_id, video_info),
+               MetricSeries.from_records(video_info.get('records', []), on_invalid))
+
+def video_to_dict(meta, series):
+    """(VideoMeta, MetricSeries) をJSONの動画情報に変換"""
+    return dict(meta.to_dict(), records=series.to_records())
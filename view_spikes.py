@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+再生数の急上昇の検出（動画ごとの小さな状態を実行ごとに O(1) で更新）
+
+動画ごとに「前回の再生数・時刻」と、再生数の伸び（1日あたり）の指数移動平均・分散だけを
+view_spike_state_{name}.json に保存し、毎回の取得時に今回の伸びと比べる。
+過去の履歴は読み直さないので、動画数が1万本を超えても1本あたりの計算量は一定。
+
+- 伸びは前回の記録からの増加を1日あたりに換算したもの（MIN_INTERVAL_HOURS 未満の間隔では計算しない）
+- 移動平均の重みは経過時間に応じて決める（時定数 TAU_HOURS、実行間隔が変わっても同じ重み付け）
+- 平常時の伸びより Z_THRESHOLD 標準偏差以上、かつ MIN_RATIO 倍以上、かつ MIN_RATE 回/日以上なら急上昇
+- 同じ動画は COOLDOWN_HOURS の間は再検出しない
+
+検出した急上昇は view_spikes_{name}.jsonl に1行1件で追記する。
+
+状態の保存形式:
+    {"format": 1, "videos": {"動画ID": [前回の時刻（経過秒数）, 前回の再生数, 平均, 分散, 更新回数, 最終検出時刻], ...}}
+"""
+
+import math
+
+from storage import encode_line, load_json, read_lines, save_json
+from video_series import parse_timestamp
+
+FORMAT_VERSION = 1
+SPIKE_TYPE = '急上昇'
+TAU_HOURS = 72  # 移動平均の時定数（時間）
+MIN_INTERVAL_HOURS = 1  # 伸びを計算する最短の間隔（時間）
+MIN_OBSERVATIONS = 6  # 判定を始めるまでの更新回数
+Z_THRESHOLD = 4.0
+MIN_RATIO = 3.0
+MIN_RATE = 1000  # 急上昇とみなす伸びの下限（回/日）
+VARIANCE_FLOOR = 0.1  # 標準偏差の下限（平均に対する割合、伸びが一定の動画の誤検出を防ぐ）
+COOLDOWN_HOURS = 24
+
+def state_file_path(channel_name):
+    return f'view_spike_state_{channel_name}.json'
+
+def events_file_path(channel_name):
+    return f'view_spikes_{channel_name}.jsonl'
+
+class ViewSpikeDetector:
+    """1チャンネル分の急上昇検出の状態"""
+    
+    def __init__(self, data=None):
+        data = data or {}
+        if data.get('format') != FORMAT_VERSION:
+            data = {}
+        self.videos = data.get('videos', {})
+        self.spikes = []
+    
+    @classmethod
+    def load(cls, file_path):
+        return cls(load_json(file_path, None))
+    
+    def save(self, file_path):
+        save_json(file_path, {'format': FORMAT_VERSION, 'videos': self.videos})
+    
+    def observe(self, video, timestamp):
+        """1動画の今回の再生数で状態を更新
+        
+        Args:
+            video: 取得した動画情報（'動画ID' / '再生数' / 'タイトル' / 'type'）
+            timestamp: 今回の実行時刻（'YYYY-MM-DD HH:MM:SS'）
+        
+        Returns:
+            急上昇を検出した場合はその内容、それ以外はNone
+        """
+        video_id = video['動画ID']
+        views = video['再生数']
+        seconds = parse_timestamp(timestamp)
+        state = self.videos.get(video_id)
+        if state is None:
+            self.videos[video_id] = [seconds, views, 0.0, 0.0, 0, None]
+            return None
+        
+        last_seconds, last_views, mean, variance, count, last_flagged = state
+        hours = (seconds - last_seconds) / 3600
+        if hours < MIN_INTERVAL_HOURS:
+            return None
+        # 再生数が減った場合（スパム除去など）は伸び0として扱う
+        rate = max(views - last_views, 0) / hours * 24
+        
+        spike = None
+        if count >= MIN_OBSERVATIONS and (last_flagged is None or seconds - last_flagged >= COOLDOWN_HOURS * 3600):
+            deviation = math.sqrt(max(variance, (VARIANCE_FLOOR * mean) ** 2, 1.0))
+            score = (rate - mean) / deviation
+            if score >= Z_THRESHOLD and rate >= MIN_RATIO * mean and rate >= MIN_RATE:
+                spike = {
+                    'timestamp': timestamp,
+                    '動画ID': video_id,
+                    'タイプ': SPIKE_TYPE,
+                    'タイトル': video['タイトル'],
+                    'type': video.get('type'),
+                    '現在の値': views,
+                    '日速': round(rate),
+                    '平常時の日速': round(mean),
+                    'スコア': round(score, 1),
+                    '検出日': timestamp[:10]
+                }
+                last_flagged = seconds
+                self.spikes.append(spike)
+        
+        # 指数移動平均・分散を更新（急上昇した値も取り込み、続く場合は新しい平常値になる）
+        if count == 0:
+            mean, variance = rate, 0.0
+        else:
+            alpha = 1 - math.exp(-hours / TAU_HOURS)
+            diff = rate - mean
+            increment = alpha * diff
+            mean += increment
+            variance = (1 - alpha) * (variance + diff * increment)
+        self.videos[video_id] = [seconds, views, round(mean, 3), round(variance, 3), count + 1, last_flagged]
+        return spike
+
+def append_spike_events(channel_name, spikes):
+    """検出した急上昇を追記"""
+    if not spikes:
+        return
+    with open(events_file_path(channel_name), 'ab') as f:
+        for spike in spikes:
+            f.write(encode_line(spike))
+
+def load_spike_events(channel_name):
+    """全件を時刻順に返す"""
+    return read_lines(events_file_path(channel_name))
@@ -10,9 +10,22 @@ import pandas as pd
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
-import json
+import numpy as np
 import os
 import glob
+from types import MappingProxyType
+
+from storage import load_json
+from daily_history import load_video_series
+from channel_stats_store import find_previous_day_entry, load_channel_series
+from title_search import TitleSearchIndex
+from data_store import TalentDataStore, freeze
+from video_analytics import build_chart_arrays, build_growth_matrix, build_video_entry, type_totals
+from cohort_curves import cohort_file_path, cohort_summary
+from milestone_forecast import forecast_file_path, upcoming_milestones
+from milestone_events import load_milestone_events
+from view_spikes import load_spike_events
+from dashboard_profiler import RerunProfiler, StepTimer, profile_modes
 
 # ページ設定
 st.set_page_config(
@@ -33,6 +46,11 @@ if 'show_views_graph' not in st.session_state:
 if 'show_likes_graph' not in st.session_state:
     st.session_state.show_likes_graph = True
 
+# 再実行プロファイル（?profile=1 または環境変数 DASHBOARD_PROFILE で有効）
+profiler = RerunProfiler(profile_modes(st.query_params))
+profiler.start()
+profiler.section("初期化・CSS")
+
 # タレントのバナー画像URL
 TALENT_BANNERS = {
     "LEWNE": "https://yt3.googleusercontent.com/TjOjwrUdPkWglNkEgvhXt8dS36kqyKB7XwjMWwnnwWg_VgrN0EMm_XXTTR_WtI18AceNz-uY=w1707-fcrop64=1,00005a57ffffa5a8-k-c0xffffffff-no-nd-rj",
@@ -668,56 +686,185 @@ def get_available_talents():
 
 def load_history(talent_name):
     """履歴データを読み込む"""
-    history_file = f'video_history_{talent_name}.json'
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return None
-    return None
+    return load_json(f'video_history_{talent_name}.json', None)
 
 def load_logs(talent_name):
     """ログデータを読み込む"""
-    log_file = f'check_log_{talent_name}.json'
-    if os.path.exists(log_file):
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    return load_json(f'check_log_{talent_name}.json', [])
 
 def load_video_daily_history(talent_name):
-    """動画別履歴データを読み込む（集約データを優先）"""
-    # 集約データを優先的に読み込む
-    aggregated_file = f'video_daily_aggregated_{talent_name}.json'
-    if os.path.exists(aggregated_file):
-        try:
-            with open(aggregated_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
+    """動画別履歴データを読み込む（集約データを優先）
     
-    # 集約データがない場合は生データを読み込む
-    history_file = f'video_daily_history_{talent_name}.json'
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+    Returns:
+        {動画ID: (VideoMeta, MetricSeries)}
+    """
+    return load_video_series(talent_name)
+
+# 動画リストの種類フィルタ・並び替え
+VIDEO_TYPE_FILTERS = {
+    "すべて": 'ALL',
+    "📹 Movie": 'Movie',
+    "🎬 Short": 'Short',
+    "🔴 LiveArchive": 'LiveArchive'
+}
+SORT_OPTIONS = {
+    "📊 再生数TOP": '再生数',
+    "👍 高評価TOP": '高評価数',
+    "📊📈 [再]増加率TOP": '再生数増加率',
+    "👍💹 [高]増加率TOP": '高評価増加率'
+}
+PAGE_SIZE = 50  # 1ページに表示する動画カード数
+
+# ヒートマップの表示期間（日数、Noneは全期間）
+HEATMAP_PERIODS = {
+    "30日": 30,
+    "90日": 90,
+    "180日": 180,
+    "全期間": None
+}
+# 選択動画グラフの横軸
+CHART_X_AXES = {
+    "📅 日付": 'dates',
+    "🎂 公開からの日数": 'ages'
+}
+# コホート別成長曲線の指標
+COHORT_METRICS = {
+    "📊 再生数": 'views',
+    "👍 高評価数": 'likes'
+}
+TYPE_COLORS = {'Movie': '#636EFA', 'Short': '#EF553B', 'LiveArchive': '#00CC96'}
+
+DATA_FILE_PATTERNS = (
+    'video_history_{}.json',
+    'check_log_{}.json',
+    'channel_stats_{}.jsonl',
+    'channel_stats_daily_{}.jsonl',
+    'video_daily_aggregated_{}.json',
+    'video_daily_history_{}.json',
+    'cohort_curves_{}.json',
+    'milestone_forecast_{}.json',
+    'milestone_events_{}.jsonl',
+    'view_spikes_{}.jsonl'
+)
+
+def get_data_version(talent_name):
+    """タレントのデータファイルの更新時刻とサイズ（スナップショットのバージョンに使う）"""
+    version = []
+    for pattern in DATA_FILE_PATTERNS:
+        file_path = pattern.format(talent_name)
+        if os.path.exists(file_path):
+            stat = os.stat(file_path)
+            version.append((file_path, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
 
-def filter_videos_by_type(video_history, video_type):
-    """動画を種類でフィルタリング"""
-    if video_type == 'ALL':
-        return video_history
-    filtered = {}
-    for video_id, video_data in video_history.items():
-        if video_data.get('type') == video_type:
-            filtered[video_id] = video_data
-    return filtered
+def build_video_index(video_history):
+    """動画リストのインデックスを作成（データ更新ごとに1回）
+    
+    Returns:
+        {'videos': {動画ID: 動画リストの1行},
+         'orderings': {(種類, 並び替えキー): 並び替え済みの動画IDリスト},
+         'search': タイトル検索用の TitleSearchIndex}
+    """
+    videos = {}
+    for video_id, (meta, series) in video_history.items():
+        if len(series) >= 1:
+            videos[video_id] = build_video_entry(meta, series)
+    
+    # 再生数順を基準に、種類ごと・並び替えキーごとの順序を作っておく
+    by_views = sorted(videos.values(), key=lambda x: x['再生数'], reverse=True)
+    orderings = {}
+    for video_type in VIDEO_TYPE_FILTERS.values():
+        entries = by_views if video_type == 'ALL' else [v for v in by_views if v['type'] == video_type]
+        for sort_key in SORT_OPTIONS.values():
+            ordered = sorted(entries, key=lambda x: x[sort_key], reverse=True)
+            orderings[(video_type, sort_key)] = [v['id'] for v in ordered]
+    
+    search_index = TitleSearchIndex({video_id: v['タイトル'] for video_id, v in videos.items()})
+    
+    return {'videos': videos, 'orderings': orderings, 'search': search_index}
+
+UPCOMING_HORIZON_DAYS = 7  # 達成予定のキリ番を表示する期間（日）
+
+def build_upcoming_table(forecast):
+    """集約時に計算済みのキリ番予測から、表示用の表を作成"""
+    upcoming = upcoming_milestones(forecast, UPCOMING_HORIZON_DAYS)
+    if not upcoming:
+        return None
+    return pd.DataFrame([{
+        '予定日': row['予定日'][:16],
+        'タイトル': row['タイトル'],
+        '種類': row['type'],
+        '指標': row['指標'],
+        'キリ番': f"{row['キリ番']:,}",
+        '現在': f"{row['現在の値']:,}",
+        '日速': f"+{row['日速']:,.1f}"
+    } for row in upcoming])
+
+def build_milestone_event_index(events, video_history):
+    """キリ番達成履歴の表（新しい順）と、動画IDごとの行番号の索引を作成"""
+    if not events:
+        return None
+    rows = []
+    for event in reversed(events):
+        video = video_history.get(event['動画ID'])
+        unit = "回" if event['タイプ'] == '再生数' else "件"
+        rows.append({
+            '達成日時': event['timestamp'][:16],
+            'タイトル': video[0].title if video else event['動画ID'],
+            '指標': event['タイプ'],
+            'キリ番': f"{event['キリ番']:,}{unit}",
+            '動画ID': event['動画ID']
+        })
+    timeline = pd.DataFrame(rows)
+    return {'timeline': timeline, 'by_video': timeline.groupby('動画ID').indices}
+
+SPIKE_DAYS = 7  # 再生数の急上昇を表示する期間（日）
+
+def build_spike_table(events, latest_timestamp):
+    """直近 SPIKE_DAYS 日の再生数の急上昇の表（新しい順）"""
+    if not events or not latest_timestamp:
+        return None
+    cutoff = (datetime.strptime(latest_timestamp, '%Y-%m-%d %H:%M:%S') - timedelta(days=SPIKE_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+    rows = [{
+        '検出日時': event['timestamp'][:16],
+        'タイトル': event['タイトル'],
+        '種類': event.get('type'),
+        '日速': f"+{event['日速']:,}",
+        '平常時': f"+{event['平常時の日速']:,}",
+        '倍率': f"{event['日速'] / event['平常時の日速']:.1f}倍" if event['平常時の日速'] > 0 else "-",
+        '再生数': f"{event['現在の値']:,}"
+    } for event in reversed(events) if event['timestamp'] >= cutoff]
+    return pd.DataFrame(rows) if rows else None
+
+def build_talent_data(talent_name):
+    """タレント1人分の表示用データを読み込む（全セッション共通のスナップショットになる）
+    
+    読み込み・計算の内訳の時間は build_timings に入れておく（プロファイル表示用）。
+    """
+    timer = StepTimer()
+    video_history = MappingProxyType(timer.measure("動画別履歴の読み込み", load_video_daily_history, talent_name))
+    history = timer.measure("前回値の読み込み", load_history, talent_name)
+    data = {
+        'history': freeze(history) if history else None,
+        'channel_series': freeze(timer.measure("チャンネル推移の読み込み", load_channel_series, talent_name)),
+        'video_history': video_history,
+        'video_index': timer.measure("動画リストのインデックス", build_video_index, video_history) if video_history else None,
+        'growth': timer.measure("再生数増加の行列", build_growth_matrix, video_history),
+        'chart_arrays': timer.measure("グラフ用配列", build_chart_arrays, video_history),
+        'cohorts': timer.measure("コホート別成長曲線", lambda: cohort_summary(load_json(cohort_file_path(talent_name), None))),
+        'upcoming': timer.measure("キリ番予測", lambda: build_upcoming_table(load_json(forecast_file_path(talent_name), None))),
+        'milestone_events': timer.measure("キリ番達成の履歴",
+                                          lambda: build_milestone_event_index(load_milestone_events(talent_name), video_history)),
+        'spikes': timer.measure("再生数の急上昇",
+                                lambda: build_spike_table(load_spike_events(talent_name), history.get('timestamp') if history else None))
+    }
+    data['build_timings'] = freeze(timer.timings)
+    return data
+
+@st.cache_resource
+def get_data_store():
+    """プロセス共通のデータストア（全セッションで同じインスタンス）"""
+    return TalentDataStore(build_talent_data, get_data_version)
 
 def calculate_growth(records, period='1DAY'):
     """指定期間の増加数を計算"""
@@ -768,6 +915,7 @@ def aggregate_records_by_date(records):
     return sorted(date_records.values(), key=lambda x: x['timestamp'])
 
 # サイドバー
+profiler.section("サイドバー")
 with st.sidebar:
     st.header("🎵 RK Music")
     st.subheader("タレント")
@@ -841,9 +989,12 @@ if not selected_talent:
     st.info("📡 タレントを選択してください")
     st.stop()
 
-history = load_history(selected_talent)
-logs = load_logs(selected_talent)
-video_history = load_video_daily_history(selected_talent)
+# 全セッション共通のスナップショット（読み取り専用、データ更新時に差し替わる）
+profiler.section("スナップショット取得")
+talent_data = get_data_store().get(selected_talent)
+history = talent_data['history']
+channel_series = talent_data['channel_series']
+video_history = talent_data['video_history']
 
 if not history:
     st.error(f"❌ {selected_talent} のデータが見つかりません")
@@ -852,6 +1003,7 @@ if not history:
 channel_stats = history.get('channel_stats', {})
 
 # ページヘッダー
+profiler.section("チャンネル統計")
 st.markdown('<div class="page-header">', unsafe_allow_html=True)
 st.title(f"📺 {channel_stats.get('チャンネル名', selected_talent)}")
 st.markdown('</div>', unsafe_allow_html=True)
@@ -860,7 +1012,7 @@ st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 # チャンネル統計
 col1, col2, col3 = st.columns(3)
 
-# 前日比計算（logsから取得）
+# 前日比計算（チャンネル統計の推移から取得）
 subscribers_change = 0
 subscribers_change_rate = 0.0
 total_views_change = 0
@@ -868,9 +1020,9 @@ total_views_change_rate = 0.0
 video_count_change = 0
 video_count_change_rate = 0.0
 
-if len(logs) >= 2:
-    current_log = logs[-1]
-    previous_log = logs[-2]
+previous_log = find_previous_day_entry(channel_series) if channel_series else None
+if previous_log:
+    current_log = channel_series[-1]
     
     # 登録者数の変化
     current_subs = current_log.get('登録者数', 0)
@@ -912,9 +1064,178 @@ with col3:
         f"{video_count_change:+,}" if video_count_change != 0 else None
     )
 
+# チャンネル統計の長期推移
+profiler.section("チャンネル推移グラフ")
+if len(channel_series) >= 2:
+    with st.expander("📈 チャンネル推移"):
+        series_dates = [entry['timestamp'] for entry in channel_series]
+        col_trend1, col_trend2 = st.columns(2)
+        with col_trend1:
+            fig_subs = go.Figure(go.Scatter(
+                x=series_dates,
+                y=[entry.get('登録者数', 0) for entry in channel_series],
+                mode='lines',
+                name="登録者数"
+            ))
+            fig_subs.update_layout(height=300, title="登録者数", margin=dict(l=50, r=20, t=40, b=40))
+            st.plotly_chart(fig_subs, use_container_width=True)
+        with col_trend2:
+            fig_views = go.Figure(go.Scatter(
+                x=series_dates,
+                y=[entry.get('総再生数', 0) for entry in channel_series],
+                mode='lines',
+                name="総再生数"
+            ))
+            fig_views.update_layout(height=300, title="総再生数", margin=dict(l=50, r=20, t=40, b=40))
+            st.plotly_chart(fig_views, use_container_width=True)
+
+# 達成予定のキリ番（集約時に予測済み）・再生数の急上昇（取得時に検出済み）
+profiler.section("急上昇・キリ番予測・達成履歴")
+spike_table = talent_data['spikes']
+if spike_table is not None:
+    with st.expander(f"🚀 再生数の急上昇（直近{SPIKE_DAYS}日、{len(spike_table)}件）", expanded=True):
+        st.dataframe(spike_table, hide_index=True, use_container_width=True)
+        st.caption("1日あたりの伸びが平常時（指数移動平均）を大きく上回った動画")
+
+upcoming_table = talent_data['upcoming']
+if upcoming_table is not None:
+    with st.expander(f"⏳ {UPCOMING_HORIZON_DAYS}日以内に達成予定のキリ番 ({len(upcoming_table)}件)"):
+        st.dataframe(upcoming_table, hide_index=True, use_container_width=True)
+        st.caption("直近7日間の日次レコードの伸び（中央値）から予測")
+
+# キリ番達成の履歴（全期間、動画別の索引は作成済み）
+milestone_events = talent_data['milestone_events']
+if milestone_events is not None:
+    timeline = milestone_events['timeline']
+    with st.expander(f"🏆 キリ番達成の履歴 ({len(timeline)}件)"):
+        event_video_ids = list(milestone_events['by_video'].keys())
+        event_video = st.selectbox(
+            "🎞️ 動画",
+            [None] + event_video_ids,
+            format_func=lambda video_id: "すべての動画（新しい順）" if video_id is None
+                else timeline['タイトル'].iat[milestone_events['by_video'][video_id][0]],
+            key="milestone_event_video"
+        )
+        if event_video is None:
+            st.dataframe(timeline.drop(columns='動画ID'), hide_index=True, use_container_width=True)
+        else:
+            video_events = timeline.iloc[milestone_events['by_video'][event_video]]
+            st.dataframe(video_events[['達成日時', '指標', 'キリ番']], hide_index=True, use_container_width=True)
+
+# 全動画の日別再生数増加（データ更新ごとに計算済みの行列を切り出して表示）
+profiler.section("ヒートマップ")
+growth = talent_data['growth']
+if growth is not None and st.toggle("🔥 日別再生数増加ヒートマップ"):
+    col_period, col_type, col_count = st.columns([1, 2, 2])
+    with col_period:
+        period_option = st.selectbox("📅 期間", list(HEATMAP_PERIODS.keys()), index=1)
+    with col_type:
+        heatmap_type = st.radio("🎞️ 対象", list(VIDEO_TYPE_FILTERS.keys()), horizontal=True, key="heatmap_type")
+    with col_count:
+        top_count = len(growth['video_ids'])
+        if top_count > 10:
+            top_count = st.slider("🔢 表示本数（期間中の増加順）", 10, top_count, min(30, top_count), step=10)
+    
+    period_days = HEATMAP_PERIODS[period_option]
+    days = slice(-period_days, None) if period_days else slice(None)
+    gains = growth['gains'][:, days]
+    
+    rows = np.arange(len(growth['video_ids']))
+    if VIDEO_TYPE_FILTERS[heatmap_type] != 'ALL':
+        rows = rows[growth['types'] == VIDEO_TYPE_FILTERS[heatmap_type]]
+    rows = rows[np.argsort(-np.nansum(gains[rows], axis=1), kind='stable')][:top_count]
+    
+    if len(rows) == 0:
+        st.info("該当する動画がありません")
+    else:
+        labels = [f"{rank}. {growth['titles'][row][:25]}" for rank, row in enumerate(rows, start=1)]
+        fig_heatmap = go.Figure(go.Heatmap(
+            z=gains[rows],
+            x=growth['dates'][days],
+            y=labels,
+            colorscale='YlOrRd',
+            colorbar=dict(title="増加"),
+            hovertemplate="%{y}<br>%{x}<br>+%{z:,.0f}回<extra></extra>"
+        ))
+        fig_heatmap.update_layout(
+            height=max(300, 22 * len(rows) + 80),
+            yaxis=dict(autorange='reversed'),
+            margin=dict(l=50, r=20, t=30, b=40)
+        )
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+    
+    # タイプ別の合計
+    fig_types = go.Figure()
+    for video_type, totals in type_totals(growth, days).items():
+        fig_types.add_trace(go.Scatter(
+            x=growth['dates'][days],
+            y=totals,
+            mode='lines',
+            name=video_type,
+            line=dict(color=TYPE_COLORS[video_type])
+        ))
+    fig_types.update_layout(height=300, title="タイプ別 日別再生数増加", hovermode='x unified',
+                            margin=dict(l=50, r=20, t=40, b=40))
+    st.plotly_chart(fig_types, use_container_width=True)
+
+# コホート別成長曲線（集約時に計算済みの分位点を描くだけ）
+profiler.section("コホート別成長曲線")
+cohorts = talent_data['cohorts']
+if cohorts and st.toggle("👥 コホート別成長曲線（タイプ × 公開月）"):
+    col_metric, col_cohort_type, col_log = st.columns([2, 3, 1])
+    with col_metric:
+        cohort_metric_option = st.radio("指標", list(COHORT_METRICS.keys()), horizontal=True, key="cohort_metric")
+    with col_cohort_type:
+        cohort_type = st.radio("🎞️ タイプ", list(TYPE_COLORS.keys()), horizontal=True, key="cohort_type")
+    with col_log:
+        cohort_log = st.checkbox("対数軸", value=True, key="cohort_log")
+    
+    months = sorted((key.split('|')[1] for key in cohorts if key.split('|')[0] == cohort_type), reverse=True)
+    selected_months = st.multiselect("📅 公開月", months, default=months[:3], key=f"cohort_months_{cohort_type}")
+    
+    if not selected_months:
+        st.info("公開月を選択してください")
+    else:
+        metric = COHORT_METRICS[cohort_metric_option]
+        palette = px.colors.qualitative.Plotly
+        fig_cohort = go.Figure()
+        for i, month in enumerate(selected_months):
+            curve = cohorts[f'{cohort_type}|{month}'][metric]
+            color = palette[i % len(palette)]
+            # 25～75パーセンタイルの帯と中央値
+            fig_cohort.add_trace(go.Scatter(
+                x=curve['ages'] + curve['ages'][::-1],
+                y=curve['p75'] + curve['p25'][::-1],
+                fill='toself',
+                fillcolor=color,
+                opacity=0.2,
+                line=dict(width=0),
+                hoverinfo='skip',
+                showlegend=False
+            ))
+            fig_cohort.add_trace(go.Scatter(
+                x=curve['ages'],
+                y=curve['p50'],
+                customdata=curve['count'],
+                mode='lines',
+                name=f"{month} (中央値)",
+                line=dict(color=color, width=2),
+                hovertemplate="%{x}日目: %{y:,.0f}（%{customdata}本）<extra></extra>"
+            ))
+        fig_cohort.update_layout(
+            height=400,
+            xaxis_title="公開からの日数",
+            yaxis_title=cohort_metric_option,
+            yaxis_type='log' if cohort_log else 'linear',
+            margin=dict(l=50, r=20, t=30, b=50)
+        )
+        st.plotly_chart(fig_cohort, use_container_width=True)
+        st.caption("線は中央値、帯は25～75パーセンタイル（確定した日のみ、値は約5%の誤差を含む近似）")
+
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # グラフエリア（選択された動画がある場合のみ表示）
+profiler.section("選択動画グラフ（Figure作成）")
 if st.session_state.selected_videos and video_history:
     st.subheader("📈 選択動画の推移")
     
@@ -925,48 +1246,32 @@ if st.session_state.selected_videos and video_history:
         show_likes = st.checkbox("👍 高評価数", value=st.session_state.show_likes_graph, key="likes_check")
         st.session_state.show_views_graph = show_views
         st.session_state.show_likes_graph = show_likes
+    with col_graph2:
+        x_axis_option = st.radio("↔️ 横軸", list(CHART_X_AXES.keys()), horizontal=True, key="chart_x_axis")
+    x_axis = CHART_X_AXES[x_axis_option]
     
     # グラフ作成
     if show_views or show_likes:
         fig = go.Figure()
+        chart_arrays = talent_data['chart_arrays']
         
         for video_id in st.session_state.selected_videos:
-            if video_id not in video_history:
+            # 計算済みの配列をそのまま使う（点ごとの変換はしない）
+            arrays = chart_arrays.get(video_id)
+            if arrays is None or arrays[x_axis] is None:
                 continue
             
-            video_data = video_history[video_id]
-            video_title = video_data.get('タイトル', '')
-            records = video_data.get('records', [])
-            
-            if not records:
-                continue
-            
-            # データを日付順にソート
-            sorted_records = sorted(records, key=lambda x: x.get('timestamp', ''))
-            
-            dates = []
-            views = []
-            likes = []
-            
-            for record in sorted_records:
-                timestamp_str = record.get('timestamp', '')
-                try:
-                    timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                    dates.append(timestamp.strftime('%Y-%m-%d'))
-                    views.append(record.get('再生数', 0))
-                    # 'いいね数'と'高評価数'の両方に対応
-                    likes.append(record.get('高評価数', record.get('いいね数', 0)))
-                except:
-                    continue
+            video_title = video_history[video_id][0].title
+            x_values = arrays[x_axis]
             
             # 短いタイトルを作成（最初の30文字）
             short_title = video_title[:30] + '...' if len(video_title) > 30 else video_title
             
             # 再生数のグラフ
-            if show_views and dates:
+            if show_views:
                 fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=views,
+                    x=x_values,
+                    y=arrays['views'],
                     mode='lines+markers',
                     name=f"{short_title} (再生数)",
                     line=dict(width=2),
@@ -974,10 +1279,10 @@ if st.session_state.selected_videos and video_history:
                 ))
             
             # 高評価数のグラフ
-            if show_likes and dates:
+            if show_likes:
                 fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=likes,
+                    x=x_values,
+                    y=arrays['likes'],
                     mode='lines+markers',
                     name=f"{short_title} (高評価)",
                     line=dict(width=2, dash='dot'),
@@ -987,7 +1292,7 @@ if st.session_state.selected_videos and video_history:
         # レイアウト設定
         fig.update_layout(
             height=400,
-            xaxis_title="日付",
+            xaxis_title="公開からの日数" if x_axis == 'ages' else "日付",
             yaxis_title="数値",
             hovermode='x unified',
             legend=dict(
@@ -1000,6 +1305,7 @@ if st.session_state.selected_videos and video_history:
             margin=dict(l=50, r=150, t=30, b=50)
         )
         
+        profiler.section("選択動画グラフ（描画）")
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("📊 グラフに表示する項目を選択してください")
@@ -1007,71 +1313,50 @@ if st.session_state.selected_videos and video_history:
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # 動画リスト
+profiler.section("動画リスト（絞り込み）")
 if not video_history:
     st.info("📡 動画データを蓄積中です。")
 else:
-    # 全動画をリストアップ
-    video_list = []
-    for video_id, video_data in video_history.items():
-        records = video_data.get('records', [])
-        if len(records) >= 1:
-            current_record = records[-1]
-            current_views = current_record.get('再生数', 0)
-            current_likes = current_record.get('高評価数', 0)  # 新しく追加
-            
-            # 前日比を計算
-            views_change = 0
-            views_change_rate = 0.0
-            likes_change = 0
-            likes_change_rate = 0.0
-            
-            if len(records) >= 2:
-                previous_record = records[-2]
-                previous_views = previous_record.get('再生数', 0)
-                previous_likes = previous_record.get('高評価数', 0)
-                
-                views_change = current_views - previous_views
-                if previous_views > 0:
-                    views_change_rate = (views_change / previous_views) * 100
-                
-                likes_change = current_likes - previous_likes
-                if previous_likes > 0:
-                    likes_change_rate = (likes_change / previous_likes) * 100
-            
-            video_list.append({
-                'id': video_id,
-                'タイトル': video_data['タイトル'],
-                'type': video_data.get('type', 'Movie'),
-                '再生数': current_views,
-                '再生数増加': views_change,
-                '再生数増加率': views_change_rate,
-                '高評価数': current_likes,
-                '高評価増加': likes_change,
-                '高評価増加率': likes_change_rate
-            })
-    
-    # 再生数でソート
-    video_list.sort(key=lambda x: x['再生数'], reverse=True)
-    
-    # ソート選択
+    # 動画リストのインデックス（データ更新ごとに1回だけ作成）
+    video_index = talent_data['video_index']
+    
+    # 種類フィルタとソート選択
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-    sort_option = st.selectbox(
-        "🔽 並び替え",
-        ["📊 再生数TOP", "👍 高評価TOP", "📊📈 [再]増加率TOP", "👍💹 [高]増加率TOP"]
-    )
+    col_filter, col_sort = st.columns([3, 2])
+    with col_filter:
+        type_option = st.radio("🎞️ 種類", list(VIDEO_TYPE_FILTERS.keys()), horizontal=True)
+    with col_sort:
+        sort_option = st.selectbox("🔽 並び替え", list(SORT_OPTIONS.keys()))
+    
+    search_query = st.text_input("🔍 タイトル検索", placeholder="曲名・配信タイトルの一部（スペース区切りでAND検索）")
+    
+    # 並び替え済みの順序を取り出す（全動画の再計算はしない）
+    ordered_ids = video_index['orderings'][(VIDEO_TYPE_FILTERS[type_option], SORT_OPTIONS[sort_option])]
+    
+    # タイトル検索（インデックスの積集合で絞り込み、並び順はそのまま）
+    matched_ids = video_index['search'].search(search_query)
+    if matched_ids is not None:
+        ordered_ids = [video_id for video_id in ordered_ids if video_id in matched_ids]
+        st.caption(f"🔍 {len(ordered_ids)}件ヒット")
+    
+    # ページ分割
+    page_count = max(1, (len(ordered_ids) + PAGE_SIZE - 1) // PAGE_SIZE)
+    page = 1
+    if page_count > 1:
+        page = st.selectbox(
+            "📄 ページ",
+            list(range(1, page_count + 1)),
+            format_func=lambda p: f"{p} / {page_count} ({(p - 1) * PAGE_SIZE + 1}～{min(p * PAGE_SIZE, len(ordered_ids))}本目)"
+        )
+    page_start = (page - 1) * PAGE_SIZE
+    video_list = [video_index['videos'][video_id] for video_id in ordered_ids[page_start:page_start + PAGE_SIZE]]
     
-    # ソート適用
-    if sort_option == "📊 再生数TOP":
-        video_list.sort(key=lambda x: x['再生数'], reverse=True)
-    elif sort_option == "👍 高評価TOP":
-        video_list.sort(key=lambda x: x['高評価数'], reverse=True)
-    elif sort_option == "📊📈 [再]増加率TOP":
-        video_list.sort(key=lambda x: x['再生数増加率'], reverse=True)
-    elif sort_option == "👍💹 [高]増加率TOP":
-        video_list.sort(key=lambda x: x['高評価増加率'], reverse=True)
+    if not video_list:
+        st.info("該当する動画がありません")
     
     # 動画カードを表示
-    for idx, video in enumerate(video_list):
+    profiler.section("動画リスト（カード描画）")
+    for idx, video in enumerate(video_list, start=page_start):
         video_url = f"https://www.youtube.com/watch?v={video['id']}"
         type_emoji = "📹" if video['type'] == 'Movie' else ("🎬" if video['type'] == 'Short' else "🔴")
         
@@ -1115,3 +1400,6 @@ else:
                 </div>
             </div>
             ''', unsafe_allow_html=True)
+
+# プロファイル（有効な場合のみサイドバーに表示）
+profiler.render(get_data_store().stats(), talent_data['build_timings'])